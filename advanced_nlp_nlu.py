@@ -2,31 +2,454 @@ import spacy
 import openai
 import requests
 import logging
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from collections import OrderedDict
+from spacy.matcher import Matcher, PhraseMatcher
 from textblob import TextBlob
 
+DEFAULT_INTENT_PATTERNS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'intent_patterns.json')
+
+class IntentMatcher:
+    """
+    Rule-based intent router compiled from a JSON pattern table.
+
+    The table maps each intent label to PhraseMatcher phrases and Matcher token
+    patterns, each with a weight in (0, 1]. Patterns may only use attributes the
+    tokenizer sets (LOWER, ORTH, IS_ALPHA, ...) so that routing never needs the
+    tagger or parser.
+    """
+
+    def __init__(self, nlp, patterns_file=DEFAULT_INTENT_PATTERNS):
+        self.matcher = Matcher(nlp.vocab)
+        self.phrase_matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+        self.rules = {}
+        with open(patterns_file) as f:
+            table = json.load(f)
+        for label, rules in table.items():
+            for i, phrase in enumerate(rules.get('phrases', [])):
+                key = f"{label}:phrase:{i}"
+                self.phrase_matcher.add(key, [nlp.make_doc(phrase['text'])])
+                self.rules[nlp.vocab.strings[key]] = (label, phrase.get('weight', 1.0))
+            for i, pattern in enumerate(rules.get('patterns', [])):
+                key = f"{label}:pattern:{i}"
+                self.matcher.add(key, [pattern['pattern']])
+                self.rules[nlp.vocab.strings[key]] = (label, pattern.get('weight', 1.0))
+
+    def match(self, doc):
+        """
+        Score every intent label against a tokenized Doc.
+
+        Returns:
+            tuple: (label, confidence), or (None, 0.0) if no rule fired.
+        """
+        fired = {match_id for match_id, _, _ in self.matcher(doc)}
+        fired.update(match_id for match_id, _, _ in self.phrase_matcher(doc))
+        if not fired:
+            return None, 0.0
+        # Rules for the same label combine as a noisy-or; the winner's strength is
+        # then discounted by the share of evidence that went to competing labels.
+        misses = {}
+        for match_id in fired:
+            label, weight = self.rules[match_id]
+            misses[label] = misses.get(label, 1.0) * (1.0 - weight)
+        scores = {label: 1.0 - miss for label, miss in misses.items()}
+        label = max(scores, key=scores.get)
+        total = sum(scores.values())
+        confidence = scores[label] * scores[label] / total if total else 0.0
+        return label, confidence
+
+class LexiconSentimentScorer:
+    """
+    Vectorized polarity scoring over the TextBlob (pattern) sentiment lexicon.
+
+    The lexicon is compiled once into NumPy arrays. A batch of tokenized
+    documents is flattened, each distinct word is looked up once, and chunk
+    polarities are combined with array operations. The modifier and negation
+    rules of pattern's ``Sentiment.assessments`` ("very good", "not very good",
+    "really not good"), "!" boosts and emoticons are reproduced, so scores
+    match TextBlob's.
+    """
+
+    NEGATIONS = ('no', 'not', "n't", 'never')
+    PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+    IRONY = '(!)'
+
+    def __init__(self, lexicon=None, emoticons=None):
+        if lexicon is None:
+            from textblob.en import sentiment as lexicon
+        if emoticons is None:
+            from textblob._text import EMOTICONS as emoticons
+        words, polarity, intensity, modifier = [], [], [], []
+        for word, senses in lexicon.items():
+            # TextBlob scores raw strings without POS tags, which reads the
+            # sense-averaged entry stored under the None key.
+            if None not in senses:
+                continue
+            p, _, i = senses[None]
+            words.append(word)
+            polarity.append(p)
+            intensity.append(i)
+            modifier.append(any(pos in senses for pos in lexicon.modifiers))
+        self.index = {word: code for code, word in enumerate(words)}
+        self.polarity = np.asarray(polarity, dtype=np.float64)
+        self.intensity = np.asarray(intensity, dtype=np.float64)
+        self.is_modifier = np.asarray(modifier, dtype=bool)
+        self.emoticons = {}
+        for (_, p), faces in emoticons.items():
+            for face in faces:
+                face = face.lower()
+                # pattern only looks up short, non-alphabetic tokens.
+                if not face.isalpha() and len(face) <= 5 and face not in self.PUNCTUATION:
+                    self.emoticons.setdefault(face, p)
+
+    def word_features(self, vocabulary):
+        """
+        Look up each distinct word of a batch once.
+
+        Returns:
+            tuple: Per-word arrays (code, negation, long1, long2, ly, bangs,
+                chunk_polarity, adds_chunk), where code is -1 for words
+                outside the lexicon.
+        """
+        codes = np.fromiter((self.index.get(w, -1) for w in vocabulary), dtype=np.int64, count=len(vocabulary))
+        negation = np.isin(vocabulary, self.NEGATIONS)
+        long1 = np.fromiter((len(w.strip("'")) > 1 for w in vocabulary), dtype=bool, count=len(vocabulary))
+        lengths = np.char.str_len(vocabulary)
+        ly = np.char.endswith(vocabulary, 'ly')
+        bangs = np.where((lengths > 0) & (np.char.strip(vocabulary, '!') == ''), lengths, 0)
+        # spaCy keeps "!!!" as one token where pattern sees three "!", which
+        # boost one by one and are too short to end a modifier or negation.
+        long1 &= bangs == 0
+        long2 = (lengths > 2) & (bangs == 0)
+        chunk_polarity = np.fromiter((self.emoticons.get(w, 0.0) for w in vocabulary), dtype=np.float64,
+                                     count=len(vocabulary))
+        adds_chunk = (codes < 0) & ((vocabulary == self.IRONY) | np.isin(vocabulary, list(self.emoticons)))
+        return codes, negation, long1, long2, ly, bangs, chunk_polarity, adds_chunk
+
+    @staticmethod
+    def carry(doc_start, known, modifier_kind, negation, long1, long2):
+        """
+        Derive pattern's modifier/negation state for a flattened batch.
+
+        modifier_kind is 0 for words that are not known modifiers, 1 for
+        modifiers and 2 for '-ly' modifiers, which can take a following
+        negation ("really not good"). Each state is set and cleared by
+        specific tokens, so it is read off the last set and clear positions
+        before every token.
+
+        Returns:
+            tuple: Boolean arrays (merged, inverted, negates): a known word
+                folds into the previous chunk, a known word follows a
+                negation, and an unknown negation flips the modifier's chunk.
+        """
+        positions = np.arange(len(known))
+        first = np.maximum.accumulate(np.where(doc_start, positions, 0))
+
+        def last_before(mask):
+            # Position of the last True strictly before each token in its document, else -1.
+            previous = np.empty(len(mask), dtype=np.int64)
+            previous[0] = -1
+            previous[1:] = np.maximum.accumulate(np.where(mask, positions, -1))[:-1]
+            return np.where(previous >= first, previous, -1)
+
+        # A modifier lasts until the next known word or a longer unknown word;
+        # an unknown negation after an '-ly' modifier keeps it.
+        modifier_at = last_before(known)
+        kind = np.where(modifier_at >= 0, modifier_kind[np.maximum(modifier_at, 0)], 0)
+        unknown = ~known
+        ended = np.where(kind == 2, last_before(unknown & long2 & ~negation), last_before(unknown & long2))
+        modifier = np.where(ended < modifier_at, kind, 0)
+        negates = unknown & negation & (modifier == 2)
+        # A negation lasts across short words until the next known word or a
+        # longer unknown word, unless it was spent on an '-ly' modifier.
+        negation_set = last_before(negation & ~negates)
+        negation_cleared = last_before((known & ~negation) | (unknown & long1 & ~negation) | negates)
+        return known & (modifier != 0), known & (negation_set > negation_cleared), negates
+
+    def score(self, docs):
+        """
+        Compute the polarity of each document in a batch.
+
+        Args:
+            docs (iterable): spaCy Docs or lists of token strings.
+
+        Returns:
+            numpy.ndarray: One polarity in [-1.0, 1.0] per document.
+        """
+        words, lengths = [], []
+        for doc in docs:
+            tokens = [token.lower_ for token in doc] if hasattr(doc, 'vocab') else [token.lower() for token in doc]
+            words.extend(tokens)
+            lengths.append(len(tokens))
+        n_docs = len(lengths)
+        doc_ids = np.repeat(np.arange(n_docs), lengths)
+        # Encode the batch against its distinct words, so every lookup and
+        # string test below runs once per word type instead of once per token.
+        vocabulary = list(dict.fromkeys(words))
+        positions = {word: position for position, word in enumerate(vocabulary)}
+        inverse = np.fromiter(map(positions.__getitem__, words), dtype=np.int64, count=len(words))
+        vocabulary = np.asarray(vocabulary, dtype=str)
+        # spaCy keeps whitespace runs as tokens; pattern's tokenizer drops them.
+        keep = (np.char.strip(vocabulary) != '')[inverse]
+        inverse, doc_ids = inverse[keep], doc_ids[keep]
+        if len(inverse) == 0:
+            return np.zeros(n_docs)
+        features = [feature[inverse] for feature in self.word_features(vocabulary)]
+        codes, negation, long1, long2, ly, bangs, chunk_polarity, adds_chunk = features
+
+        known = codes >= 0
+        safe_codes = np.where(known, codes, 0)
+        polarity = np.where(known, self.polarity[safe_codes], chunk_polarity)
+        intensity = np.where(known, self.intensity[safe_codes], 1.0)
+        modifier_kind = np.where(known & self.is_modifier[safe_codes], np.where(ly, 2, 1), 0)
+        doc_start = np.ones(len(doc_ids), dtype=bool)
+        doc_start[1:] = doc_ids[1:] != doc_ids[:-1]
+        merged, inverted, negates = self.carry(doc_start, known, modifier_kind, negation, long1, long2)
+
+        # Chunks start at unmodified known words, "(!)" and emoticons; every
+        # token then belongs to the latest chunk so far.
+        starts = (known & ~merged) | adds_chunk
+        chunk = np.cumsum(starts) - 1
+        chunk_doc = doc_ids[starts]
+        n_chunks = len(chunk_doc)
+        if n_chunks == 0:
+            return np.zeros(n_docs)
+
+        # Writers set their chunk's polarity. A folded word is scaled by the
+        # intensity its chunk carries: that of the previous writer, inverted
+        # when that word followed a negation.
+        writers = np.flatnonzero(known | adds_chunk)
+        carried = np.where(inverted, 1.0 / intensity, intensity)[writers]
+        scale = np.ones(len(writers))
+        scale[1:] = carried[:-1]
+        written = np.where(merged[writers], np.clip(polarity[writers] * scale, -1.0, 1.0), polarity[writers])
+        last = np.ones(len(writers), dtype=bool)
+        last[:-1] = chunk[writers[1:]] != chunk[writers[:-1]]
+        final_writer = writers[last]
+        chunk_polarity = written[last]
+
+        # Each "!" after a chunk's final writer boosts it by 1.25.
+        positions = np.arange(len(doc_ids))
+        safe_chunk = np.maximum(chunk, 0)
+        boosting = (bangs > 0) & (chunk >= 0) & (chunk_doc[safe_chunk] == doc_ids) & (positions > final_writer[safe_chunk])
+        boosts = np.bincount(chunk[boosting], weights=bangs[boosting], minlength=n_chunks)
+        chunk_polarity = np.clip(chunk_polarity * 1.25 ** boosts, -1.0, 1.0)
+
+        negated = np.zeros(n_chunks, dtype=bool)
+        negated[chunk[inverted | negates]] = True
+        chunk_polarity = np.where(negated, chunk_polarity * -0.5, chunk_polarity)
+
+        totals = np.bincount(chunk_doc, weights=chunk_polarity, minlength=n_docs)
+        counts = np.bincount(chunk_doc, minlength=n_docs)
+        return np.divide(totals, counts, out=np.zeros(n_docs), where=counts > 0)
+
+    @staticmethod
+    def labels(polarities):
+        return ["positive" if p > 0 else "negative" if p < 0 else "neutral" for p in polarities]
+
+def learned_intent_fallback(learning_module):
+    """
+    Build an intent_fallback that asks a trained classifier, such as
+    SelfModificationLearningModule, for the most likely label.
+
+    The classifier's decision margins are unbounded, so they are mapped to a
+    softmax over all labels; the confidence is the winning label's share,
+    in [0, 1] like the rule matcher's. Until the classifier has been trained
+    it ranks no labels, which is passed on as (None, 0.0).
+    """
+    def fallback(text):
+        ranked = learning_module.predict_top_k([text], k=None)[0]
+        if not ranked:
+            return None, 0.0
+        margins = np.array([score for _, score in ranked])
+        weights = np.exp(margins - margins.max())
+        return ranked[0][0], float(weights[0] / weights.sum())
+    return fallback
+
 class AdvancedNLPNLU:
-    def __init__(self, openai_api_key):
-        self.spacy_nlp = spacy.load('en_core_web_sm')
+    # Components of en_core_web_sm. The tagger and parser listen to the shared
+    # tok2vec layer, while ner carries its own embedding and runs without it.
+    PIPELINE_COMPONENTS = ('tok2vec', 'tagger', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner')
+
+    # Components each profile disables. 'tokenize' never runs the pipeline and
+    # goes through make_doc instead.
+    PIPELINE_PROFILES = {
+        'tokenize': None,
+        'ner': ('tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer'),
+        'parse': ('tagger', 'attribute_ruler', 'lemmatizer', 'ner'),
+        'intent': ('ner',),
+        'full': ()
+    }
+
+    def __init__(self, openai_api_key, doc_cache_size=1024, model_name='en_core_web_sm',
+                 intent_patterns_file=DEFAULT_INTENT_PATTERNS, intent_fallback=None, intent_examples=None):
+        self.model_name = model_name
+        self._spacy_nlp = None
+        self._tokenizer_nlp = None
+        self._intent_matcher = None
+        self._sentiment_scorer = None
+        self.intent_patterns_file = intent_patterns_file
+        # Callable mapping a text to a (label, confidence) pair, consulted only
+        # when no routing rule fires.
+        self.intent_fallback = intent_fallback
+        # Callable receiving (text, label) whenever a routing rule fires, so
+        # the fallback's classifier can be trained on rule-labeled examples.
+        self.intent_examples = intent_examples
         self.openai_api_key = openai_api_key
+        self.doc_cache = OrderedDict()
+        self.doc_cache_size = doc_cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.initialize_openai()
 
     def initialize_openai(self):
         openai.api_key = self.openai_api_key
 
+    @property
+    def spacy_nlp(self):
+        if self._spacy_nlp is None:
+            self._spacy_nlp = spacy.load(self.model_name)
+        return self._spacy_nlp
+
+    @property
+    def tokenizer_nlp(self):
+        # Workers that only tokenize load the model without any trained
+        # components, which skips reading the weights from disk.
+        if self._spacy_nlp is not None:
+            return self._spacy_nlp
+        if self._tokenizer_nlp is None:
+            self._tokenizer_nlp = spacy.load(self.model_name, exclude=list(self.PIPELINE_COMPONENTS))
+        return self._tokenizer_nlp
+
+    @property
+    def intent_matcher(self):
+        if self._intent_matcher is None:
+            self._intent_matcher = IntentMatcher(self.tokenizer_nlp, self.intent_patterns_file)
+        return self._intent_matcher
+
+    @property
+    def sentiment_scorer(self):
+        if self._sentiment_scorer is None:
+            self._sentiment_scorer = LexiconSentimentScorer()
+        return self._sentiment_scorer
+
+    def disabled_components(self, profile):
+        disabled = self.PIPELINE_PROFILES[profile]
+        return [name for name in disabled if name in self.spacy_nlp.pipe_names]
+
+    def run_profile(self, text, profile='full'):
+        if self.PIPELINE_PROFILES[profile] is None:
+            return self.tokenizer_nlp.make_doc(text)
+        return self.spacy_nlp(text, disable=self.disabled_components(profile))
+
+    def get_doc(self, text, profile='full'):
+        # Parsed Docs are cached by a hash of the text so that every method
+        # called for the same utterance shares a single pipeline run. A Doc
+        # from the full pipeline also satisfies every narrower profile.
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        for key in ((profile, digest), ('full', digest)):
+            doc = self.doc_cache.get(key)
+            if doc is not None:
+                self.doc_cache.move_to_end(key)
+                self.cache_hits += 1
+                return doc
+        self.cache_misses += 1
+        doc = self.run_profile(text, profile)
+        if self.doc_cache_size > 0:
+            self.doc_cache[(profile, digest)] = doc
+            if len(self.doc_cache) > self.doc_cache_size:
+                self.doc_cache.popitem(last=False)
+        return doc
+
+    def cache_info(self):
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': len(self.doc_cache),
+            'max_size': self.doc_cache_size
+        }
+
+    def clear_cache(self):
+        self.doc_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def analyze(self, text):
+        doc = self.get_doc(text)
+        return {
+            'doc': doc,
+            'tokens': self._doc_tokens(doc),
+            'intent': self._doc_intent(doc),
+            'entities': self._doc_entities(doc),
+            'dependencies': self._doc_dependencies(doc)
+        }
+
+    def pipe_docs(self, texts, batch_size=256, n_process=1, profile='full'):
+        # Batch paths stream straight through nlp.pipe and bypass the Doc cache,
+        # so a large backfill does not evict the entries serving live traffic.
+        if self.PIPELINE_PROFILES[profile] is None:
+            return self.tokenizer_nlp.tokenizer.pipe(texts, batch_size=batch_size)
+        return self.spacy_nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                                   disable=self.disabled_components(profile))
+
+    def analyze_many(self, texts, batch_size=256, n_process=1):
+        for doc in self.pipe_docs(texts, batch_size=batch_size, n_process=n_process):
+            yield {
+                'doc': doc,
+                'tokens': self._doc_tokens(doc),
+                'intent': self._doc_intent(doc),
+                'entities': self._doc_entities(doc),
+                'dependencies': self._doc_dependencies(doc)
+            }
+
+    def tokenize_many(self, texts, batch_size=256, n_process=1):
+        for doc in self.pipe_docs(texts, batch_size=batch_size, n_process=n_process, profile='tokenize'):
+            yield self._doc_tokens(doc)
+
+    def extract_entities_many(self, texts, batch_size=256, n_process=1):
+        for doc in self.pipe_docs(texts, batch_size=batch_size, n_process=n_process, profile='ner'):
+            yield self._doc_entities(doc)
+
+    def parse_dependencies_many(self, texts, batch_size=256, n_process=1):
+        for doc in self.pipe_docs(texts, batch_size=batch_size, n_process=n_process, profile='parse'):
+            yield self._doc_dependencies(doc)
+
     def tokenize_text(self, text):
-        doc = self.spacy_nlp(text)
-        tokens = [token.text for token in doc]
-        return tokens
+        return self._doc_tokens(self.get_doc(text, 'tokenize'))
 
     def recognize_intent(self, text):
-        doc = self.spacy_nlp(text)
-        intent = next((token.lemma_ for token in doc if "VERB" in [ancestor.pos_ for ancestor in token.ancestors]), None)
-        return intent
+        return self._doc_intent(self.get_doc(text, 'intent'))
+
+    def classify_intent(self, text):
+        label, confidence = self.intent_matcher.match(self.get_doc(text, 'tokenize'))
+        if label is not None and self.intent_examples is not None:
+            self.intent_examples(text, label)
+        elif label is None and self.intent_fallback is not None:
+            label, confidence = self.intent_fallback(text)
+        return label, confidence
 
     def extract_entities(self, text):
-        doc = self.spacy_nlp(text)
-        entities = [(ent.text, ent.label_) for ent in doc.ents]
-        return entities
+        return self._doc_entities(self.get_doc(text, 'ner'))
+
+    @staticmethod
+    def _doc_tokens(doc):
+        return [token.text for token in doc]
+
+    @staticmethod
+    def _doc_intent(doc):
+        return next((token.lemma_ for token in doc if "VERB" in [ancestor.pos_ for ancestor in token.ancestors]), None)
+
+    @staticmethod
+    def _doc_entities(doc):
+        return [(ent.text, ent.label_) for ent in doc.ents]
+
+    @staticmethod
+    def _doc_dependencies(doc):
+        return [(token.text, token.dep_, token.head.text) for token in doc]
 
     def get_assistance(self, error_context):
         response = openai.Completion.create(
@@ -41,20 +464,31 @@ class AdvancedNLPNLU:
         assistance = self.get_assistance(error_context)
         # Implement logic to utilize the assistance provided by ChatGPT-3.5
 
+    def sentiment_polarity(self, text):
+        return float(self.sentiment_scorer.score([self.get_doc(text, 'tokenize')])[0])
+
     def analyze_sentiment(self, text):
-        blob = TextBlob(text)
-        sentiment = "positive" if blob.sentiment.polarity > 0 else "negative" if blob.sentiment.polarity < 0 else "neutral"
-        return sentiment
+        return self.sentiment_scorer.labels([self.sentiment_polarity(text)])[0]
+
+    def sentiment_polarity_many(self, texts, batch_size=256):
+        batch = []
+        for doc in self.pipe_docs(texts, batch_size=batch_size, profile='tokenize'):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield from self.sentiment_scorer.score(batch).tolist()
+                batch = []
+        if batch:
+            yield from self.sentiment_scorer.score(batch).tolist()
+
+    def analyze_sentiment_many(self, texts, batch_size=256):
+        for polarity in self.sentiment_polarity_many(texts, batch_size=batch_size):
+            yield self.sentiment_scorer.labels([polarity])[0]
 
     def perform_ner(self, text):
-        doc = self.spacy_nlp(text)
-        named_entities = [(ent.text, ent.label_) for ent in doc.ents]
-        return named_entities
+        return self._doc_entities(self.get_doc(text, 'ner'))
 
     def parse_dependencies(self, text):
-        doc = self.spacy_nlp(text)
-        dependencies = [(token.text, token.dep_, token.head.text) for token in doc]
-        return dependencies
+        return self._doc_dependencies(self.get_doc(text, 'parse'))
 
     def handle_error(self, error):
         logging.error(f"An error occurred: {error}")
@@ -86,6 +520,29 @@ class ChatGPTIntegration:
             logging.error(f"ChatGPT API error: {response.status_code} - {response.text}")
             return None
 
+def benchmark_batch_throughput(nlp_module, texts, batch_size=256, n_process=1):
+    """
+    Compare the per-call loop against the nlp.pipe batch path.
+
+    Returns:
+        dict: Texts per second for each path.
+    """
+    texts = list(texts)
+    start = time.perf_counter()
+    for text in texts:
+        nlp_module._doc_dependencies(nlp_module.run_profile(text, 'parse'))
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in nlp_module.parse_dependencies_many(texts, batch_size=batch_size, n_process=n_process):
+        pass
+    pipe_seconds = time.perf_counter() - start
+    return {
+        'texts': len(texts),
+        'per_call_texts_per_second': len(texts) / loop_seconds if loop_seconds else float('inf'),
+        'pipe_texts_per_second': len(texts) / pipe_seconds if pipe_seconds else float('inf'),
+        'speedup': loop_seconds / pipe_seconds if pipe_seconds else float('inf')
+    }
+
 import unittest
 
 class TestAdvancedNLPNLU(unittest.TestCase):
@@ -94,6 +551,144 @@ class TestAdvancedNLPNLU(unittest.TestCase):
         tokens = nlp_module.tokenize_text("Hello, world!")
         self.assertEqual(tokens, ['Hello', ',', 'world', '!'])
 
+    def test_analyze_parses_once(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        text = "Book a table at Luigi's in Boston tomorrow."
+        result = nlp_module.analyze(text)
+        self.assertEqual(nlp_module.tokenize_text(text), result['tokens'])
+        self.assertEqual(nlp_module.extract_entities(text), result['entities'])
+        self.assertEqual(nlp_module.parse_dependencies(text), result['dependencies'])
+        self.assertEqual(nlp_module.cache_info()['misses'], 1)
+        self.assertEqual(nlp_module.cache_info()['hits'], 3)
+
+    def test_doc_cache_is_bounded(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key', doc_cache_size=2)
+        for text in ["one", "two", "three"]:
+            nlp_module.tokenize_text(text)
+        self.assertEqual(nlp_module.cache_info()['size'], 2)
+        nlp_module.tokenize_text("one")
+        self.assertEqual(nlp_module.cache_info()['misses'], 4)
+
+    def test_model_is_loaded_lazily(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        self.assertIsNone(nlp_module._spacy_nlp)
+        nlp_module.tokenize_text("Only tokens, please.")
+        self.assertIsNone(nlp_module._spacy_nlp)
+        nlp_module.extract_entities("Apple is based in Cupertino.")
+        self.assertIsNotNone(nlp_module._spacy_nlp)
+
+    def test_profiles_disable_unneeded_components(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        self.assertEqual(nlp_module.disabled_components('full'), [])
+        self.assertIn('parser', nlp_module.disabled_components('ner'))
+        self.assertNotIn('ner', nlp_module.disabled_components('ner'))
+        self.assertIn('ner', nlp_module.disabled_components('parse'))
+        self.assertNotIn('parser', nlp_module.disabled_components('parse'))
+
+    def test_classify_intent_routes_without_parser(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        label, confidence = nlp_module.classify_intent("Book an appointment for tomorrow.")
+        self.assertEqual(label, 'book_appointment')
+        self.assertGreater(confidence, 0.5)
+        self.assertEqual(nlp_module.classify_intent("Please list files in my home folder")[0], 'file_operation')
+        self.assertEqual(nlp_module.classify_intent("Find the nearest coffee shop")[0], 'find_information')
+        self.assertIsNone(nlp_module._spacy_nlp)
+
+    def test_classify_intent_uses_fallback_when_no_rule_fires(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key', intent_fallback=lambda text: ('small_talk', 0.4))
+        self.assertEqual(nlp_module.classify_intent("Good morning!"), ('small_talk', 0.4))
+        self.assertEqual(nlp_module.classify_intent("Book an appointment")[0], 'book_appointment')
+
+    def test_learned_intent_fallback(self):
+        class Classifier:
+            trained = False
+
+            def predict_top_k(self, texts, k=3):
+                ranked = [('small_talk', 1.2), ('weather', -0.4), ('booking', -3.0)]
+                return [ranked[:k] if self.trained else [] for _ in texts]
+
+        classifier = Classifier()
+        nlp_module = AdvancedNLPNLU('your-openai-api-key', intent_fallback=learned_intent_fallback(classifier))
+        self.assertEqual(nlp_module.classify_intent("Good morning!"), (None, 0.0))
+        classifier.trained = True
+        label, confidence = nlp_module.classify_intent("Good morning!")
+        self.assertEqual(label, 'small_talk')
+        margins = np.array([1.2, -0.4, -3.0])
+        self.assertAlmostEqual(confidence, np.exp(1.2) / np.exp(margins).sum())
+
+    def test_rule_routed_utterances_become_intent_examples(self):
+        examples = []
+        nlp_module = AdvancedNLPNLU('your-openai-api-key', intent_fallback=lambda text: ('small_talk', 0.4),
+                                    intent_examples=lambda text, label: examples.append((text, label)))
+        nlp_module.classify_intent("Book an appointment")
+        nlp_module.classify_intent("Good morning!")
+        self.assertEqual(examples, [("Book an appointment", 'book_appointment')])
+
+    def test_sentiment_matches_textblob_labels(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        corpus = [
+            "I love this assistant, it is great!",
+            "This is a terrible and useless answer.",
+            "The meeting is at 3pm on Tuesday.",
+            "The results were not good.",
+            "It was not bad at all.",
+            "What a very happy day!",
+            "The service was slow and the food was cold.",
+            "Thanks, that was really helpful.",
+            "I am extremely disappointed with the update.",
+            "Please list the files in this directory.",
+            "The new layout is beautiful but a bit confusing.",
+            "Never a dull moment here :)",
+        ]
+        expected = ["positive" if TextBlob(t).sentiment.polarity > 0 else
+                    "negative" if TextBlob(t).sentiment.polarity < 0 else "neutral" for t in corpus]
+        self.assertEqual([nlp_module.analyze_sentiment(t) for t in corpus], expected)
+        self.assertEqual(list(nlp_module.analyze_sentiment_many(corpus, batch_size=5)), expected)
+
+    def test_sentiment_polarity_matches_textblob_on_negated_modifiers(self):
+        scorer = LexiconSentimentScorer()
+        cases = [
+            ("It is not very good", ["it", "is", "not", "very", "good"]),
+            ("I am not very sad", ["i", "am", "not", "very", "sad"]),
+            ("really not that great!!", ["really", "not", "that", "great", "!!"]),
+            ("not a good idea!", ["not", "a", "good", "idea", "!"]),
+            ("very very good", ["very", "very", "good"]),
+            ("especially!!! bad", ["especially", "!!!", "bad"]),
+        ]
+        for text, tokens in cases:
+            with self.subTest(text=text):
+                self.assertAlmostEqual(scorer.score([tokens])[0], TextBlob(text).sentiment.polarity)
+        batched = scorer.score([tokens for _, tokens in cases])
+        np.testing.assert_allclose(batched, [TextBlob(text).sentiment.polarity for text, _ in cases])
+        self.assertAlmostEqual(scorer.score([["it", "is", "not", "very", "good"]])[0], -0.2692307692, places=6)
+        self.assertAlmostEqual(scorer.score([["really", "not", "that", "great", "!!"]])[0], 0.45)
+
+    def test_sentiment_polarity_is_batch_invariant(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        texts = ["not a good idea", "good", "", "very good!"]
+        batched = list(nlp_module.sentiment_polarity_many(texts, batch_size=3))
+        self.assertEqual(batched, [nlp_module.sentiment_polarity(t) for t in texts])
+        self.assertAlmostEqual(batched[1], TextBlob("good").sentiment.polarity)
+        self.assertEqual(batched[2], 0.0)
+
+    def test_batch_methods_match_single_item_methods(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        texts = ["Find flights from Paris to Berlin.", "Apple is buying a startup in London.", ""]
+        self.assertEqual(list(nlp_module.tokenize_many(texts)), [nlp_module.tokenize_text(t) for t in texts])
+        self.assertEqual(list(nlp_module.extract_entities_many(texts, batch_size=2)),
+                         [nlp_module.extract_entities(t) for t in texts])
+        self.assertEqual(list(nlp_module.parse_dependencies_many(texts, batch_size=1)),
+                         [nlp_module.parse_dependencies(t) for t in texts])
+        batched = [{k: v for k, v in r.items() if k != 'doc'} for r in nlp_module.analyze_many(texts)]
+        single = [{k: v for k, v in nlp_module.analyze(t).items() if k != 'doc'} for t in texts]
+        self.assertEqual(batched, single)
+
+    def test_benchmark_batch_throughput(self):
+        nlp_module = AdvancedNLPNLU('your-openai-api-key')
+        stats = benchmark_batch_throughput(nlp_module, ["Call me tomorrow at noon."] * 50, batch_size=16)
+        self.assertEqual(stats['texts'], 50)
+        self.assertGreater(stats['pipe_texts_per_second'], 0)
+
     # ... more tests for other methods
 
 if __name__ == '__main__':
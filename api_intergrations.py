@@ -2,14 +2,25 @@
 import requests
 import logging
 import time
+import asyncio
+import threading
+import unittest
+from collections import deque
 import retrying
+from http_transport import get_shared_transport, StandInHTTPServer, HTTPTransport
 from web_manipulation import WebManipulationModule  # Import WebManipulationModule
 from file_operations import FileOperationsModule  # Import FileOperationsModule
 
 class APIHandler:
+    def __init__(self, transport=None, **kwargs):
+        # Requests go through a pooled keep-alive transport, shared process-wide
+        # unless one is passed in, instead of a new connection per call.
+        super().__init__(**kwargs)
+        self.transport = transport if transport else get_shared_transport()
+
     def send_request(self, url, method, params=None, data=None, headers=None):
         try:
-            response = requests.request(method, url, params=params, data=data, headers=headers)
+            response = self.transport.request(method, url, params=params, data=data, headers=headers)
             return response.json()
         except requests.exceptions.RequestException as e:
             self.handle_api_error(e)
@@ -47,30 +58,158 @@ class SomeAPIWrapper(APIHandler, APIEndpoints):
         response = self.send_request(endpoint, 'POST', data=params)  # Adjust the HTTP method as needed
         return self.handle_response(response)
 
-class RateLimitedAPIHandler(APIHandler):
-    def __init__(self):
-        super().__init__()
+    def handle_response(self, response):
+        return response
+
+class SlidingWindowRateLimiter:
+    """
+    Thread-safe sliding-window-log rate limiter with per-endpoint budgets.
+
+    Each endpoint keeps the grant times of its last `limit` requests. A caller
+    reserves the earliest time at which no window of `window` seconds would
+    hold more than `limit` grants, then sleeps until then outside the lock, so
+    there are no bursts at window edges and waiters are served in order.
+    """
+
+    def __init__(self, limit=100, window=60.0, endpoint_budgets=None, clock=time.monotonic):
+        """
+        Args:
+            limit (int): Requests allowed per window for endpoints without their own budget.
+            window (float): Window length in seconds.
+            endpoint_budgets (dict): Endpoint name to a (limit, window) pair.
+            clock (callable): Monotonic time source.
+        """
+        self.default_budget = (limit, window)
+        self.endpoint_budgets = dict(endpoint_budgets or {})
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.grants = {}
+        self.stats = {}
+
+    def budget(self, endpoint):
+        return self.endpoint_budgets.get(endpoint, self.default_budget)
+
+    def reserve(self, endpoint=None, max_wait=None):
+        """
+        Reserve a request slot.
+
+        Returns:
+            float: Seconds the caller must wait before sending, or None if
+                that would exceed max_wait (nothing is reserved then).
+        """
+        limit, window = self.budget(endpoint)
+        with self.lock:
+            grants = self.grants.setdefault(endpoint, deque(maxlen=limit))
+            stats = self.stats.setdefault(endpoint, {'granted': 0, 'rejected': 0, 'waited': 0,
+                                                     'total_wait_seconds': 0.0, 'max_wait_seconds': 0.0})
+            now = self.clock()
+            slot = now
+            if grants:
+                # Slots are handed out in order, and the oldest of the last
+                # `limit` grants must have left the window.
+                slot = max(slot, grants[-1])
+                if len(grants) == limit:
+                    slot = max(slot, grants[0] + window)
+            wait = slot - now
+            if max_wait is not None and wait > max_wait:
+                stats['rejected'] += 1
+                return None
+            grants.append(slot)
+            stats['granted'] += 1
+            if wait > 0:
+                stats['waited'] += 1
+                stats['total_wait_seconds'] += wait
+                stats['max_wait_seconds'] = max(stats['max_wait_seconds'], wait)
+            return wait
+
+    def try_acquire(self, endpoint=None):
+        """Take a slot only if one is free right now, without waiting."""
+        return self.reserve(endpoint, max_wait=0) is not None
+
+    def acquire(self, endpoint=None, timeout=None):
+        """
+        Block until a slot is available.
+
+        Returns:
+            float: Seconds waited, or None if the wait would exceed timeout.
+        """
+        wait = self.reserve(endpoint, max_wait=timeout)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, endpoint=None, timeout=None):
+        """Like acquire, but waits with asyncio.sleep instead of blocking the event loop."""
+        wait = self.reserve(endpoint, max_wait=timeout)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def wait_stats(self, endpoint=None):
+        """
+        Report grants, rejected try_acquire/timeout attempts and time spent waiting.
+
+        Returns:
+            dict: Stats for one endpoint, or for all endpoints keyed by name if endpoint is None.
+        """
+        with self.lock:
+            if endpoint is not None:
+                return dict(self.stats.get(endpoint, {}))
+            return {name: dict(stats) for name, stats in self.stats.items()}
+
+class RateLimitedAPIHandler(APIHandler, APIEndpoints):
+    def __init__(self, transport=None, rate_limiter=None, **kwargs):
+        super().__init__(transport=transport, **kwargs)
         self.rate_limit_window = 60  # seconds
         self.max_requests_per_window = 100
-        self.request_counter = 0
-        self.window_start_time = time.time()
+        # Budgets for individual APIEndpoints names can be set through the
+        # limiter's endpoint_budgets; other URLs share the default budget.
+        self.rate_limiter = rate_limiter if rate_limiter else SlidingWindowRateLimiter(
+            self.max_requests_per_window, self.rate_limit_window)
 
-    def send_request(self, url, method, params=None, data=None, headers=None):
-        self.handle_rate_limit()
+    def send_request(self, url, method, params=None, data=None, headers=None, endpoint_name=None):
+        # The budget is chosen by APIEndpoints name: given explicitly, or
+        # looked up from the URL.
+        self.handle_rate_limit(endpoint_name if endpoint_name else self.endpoint_name(url))
         return super().send_request(url, method, params, data, headers)
 
-    def handle_rate_limit(self):
-        current_time = time.time()
-        if current_time - self.window_start_time > self.rate_limit_window:
-            self.window_start_time = current_time
-            self.request_counter = 0
-        if self.request_counter >= self.max_requests_per_window:
-            wait_time = self.rate_limit_window - (current_time - self.window_start_time)
-            if wait_time > 0:
-                time.sleep(wait_time)
-            self.window_start_time = current_time
-            self.request_counter = 0
-        self.request_counter += 1
+    def endpoint_name(self, url):
+        for name, endpoint in self.endpoints.items():
+            if endpoint == url:
+                return name
+        return None
+
+    def handle_rate_limit(self, endpoint=None):
+        return self.rate_limiter.acquire(endpoint)
+
+def benchmark_api_transport(call_count=200):
+    """
+    Time SomeAPIWrapper calls against a local stand-in server, comparing the
+    previous connection-per-request path with the pooled transport.
+
+    Returns:
+        dict: Per mode, elapsed seconds and TCP connections opened.
+    """
+    results = {}
+    with StandInHTTPServer() as server:
+        transport = HTTPTransport()
+        wrapper = SomeAPIWrapper(transport=transport)
+        for name, path in (('example_endpoint', '/'), ('web_manipulation_endpoint', '/web_manipulation/'),
+                           ('file_operations_endpoint', '/file_operations/')):
+            wrapper.endpoints[name] = server.url + path
+        calls = (wrapper.fetch_some_data, wrapper.perform_web_manipulation, wrapper.perform_file_operations)
+        for mode in ('per_request', 'pooled'):
+            wrapper.transport = requests if mode == 'per_request' else transport
+            connections_before = server.connections
+            start = time.perf_counter()
+            for i in range(call_count):
+                calls[i % len(calls)]({'i': i})
+            results[mode] = {
+                'seconds': time.perf_counter() - start,
+                'connections': server.connections - connections_before
+            }
+        transport.close()
+    return results
 
 class TestAPIIntegration(unittest.TestCase):
     def test_send_request(self):
@@ -79,5 +218,81 @@ class TestAPIIntegration(unittest.TestCase):
         response = api_handler.send_request(endpoint, 'GET')
         self.assertIsNotNone(response)
 
+    def test_wrapper_reuses_pooled_connections(self):
+        with StandInHTTPServer() as server:
+            transport = HTTPTransport()
+            wrapper = SomeAPIWrapper(transport=transport)
+            self.assertEqual(wrapper.get_endpoint('file_operations_endpoint'), '/file_operations/')
+            wrapper.endpoints['example_endpoint'] = f'{server.url}/data'
+            wrapper.endpoints['file_operations_endpoint'] = f'{server.url}/files'
+            self.assertEqual(wrapper.fetch_some_data({'q': 'a'})['query'], 'q=a')
+            self.assertEqual(wrapper.perform_file_operations({'op': 'list'})['body'], 'op=list')
+            self.assertEqual(server.connections, 1)
+            self.assertIs(SomeAPIWrapper().transport, RateLimitedAPIHandler().transport)
+            transport.close()
+
+    def test_rate_limiter_budgets_per_endpoint(self):
+        limiter = SlidingWindowRateLimiter(limit=3, window=0.3, endpoint_budgets={'example_endpoint': (1, 0.3)})
+        self.assertEqual([limiter.try_acquire() for _ in range(4)], [True, True, True, False])
+        self.assertTrue(limiter.try_acquire('example_endpoint'))
+        self.assertFalse(limiter.try_acquire('example_endpoint'))
+        self.assertIsNone(limiter.acquire('example_endpoint', timeout=0.01))
+        self.assertGreater(limiter.acquire('example_endpoint'), 0)
+        stats = limiter.wait_stats('example_endpoint')
+        self.assertEqual((stats['granted'], stats['rejected'], stats['waited']), (2, 2, 1))
+
+    def test_rate_limited_handler_applies_endpoint_budgets(self):
+        with StandInHTTPServer() as server:
+            limiter = SlidingWindowRateLimiter(limit=10, window=60, endpoint_budgets={'example_endpoint': (1, 0.2)})
+            handler = RateLimitedAPIHandler(transport=HTTPTransport(), rate_limiter=limiter)
+            handler.endpoints['example_endpoint'] = f'{server.url}/data'
+            self.assertEqual(handler.send_request(handler.get_endpoint('example_endpoint'), 'GET')['path'], '/data')
+            self.assertEqual(handler.send_request(f'{server.url}/data', 'GET')['path'], '/data')
+            handler.send_request(f'{server.url}/other', 'GET')
+            handler.send_request(f'{server.url}/other', 'GET', endpoint_name='file_operations_endpoint')
+            stats = limiter.wait_stats()
+            self.assertEqual(stats['example_endpoint']['granted'], 2)
+            self.assertEqual(stats['example_endpoint']['waited'], 1)
+            self.assertEqual(stats[None]['granted'], 1)
+            self.assertEqual(stats['file_operations_endpoint']['granted'], 1)
+            handler.transport.close()
+
+    def test_rate_limiter_is_thread_safe_without_edge_bursts(self):
+        limiter = SlidingWindowRateLimiter(limit=5, window=0.2)
+        granted = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(3):
+                limiter.acquire()
+                with lock:
+                    granted.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        granted.sort()
+        self.assertEqual(len(granted), 15)
+        for i in range(len(granted) - 5):
+            # Allow for scheduling jitter after each sleep.
+            self.assertGreaterEqual(granted[i + 5] - granted[i], 0.2 - 0.02)
+        stats = limiter.wait_stats()[None]
+        self.assertEqual(stats['granted'], 15)
+        self.assertGreater(stats['total_wait_seconds'], 0)
+
+    def test_rate_limiter_async_acquire(self):
+        limiter = SlidingWindowRateLimiter(limit=2, window=0.2)
+
+        async def run():
+            start = time.monotonic()
+            waits = await asyncio.gather(*[limiter.acquire_async() for _ in range(5)])
+            return waits, time.monotonic() - start
+
+        waits, elapsed = asyncio.run(run())
+        self.assertEqual(sum(1 for wait in waits if wait > 0), 3)
+        self.assertGreaterEqual(elapsed, 0.4 - 0.02)
+
 if __name__ == '__main__':
     unittest.main()
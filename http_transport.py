@@ -0,0 +1,587 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+class HTTPTransport:
+    """
+    Shared, keep-alive HTTP transport built on a requests Session.
+
+    Connections are pooled per host by urllib3 and reused across calls, so
+    repeated requests to the same API skip the TCP and TLS handshakes. Every
+    request gets (connect, read) timeouts unless the caller passes its own.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, host_pool_sizes=None,
+                 connect_timeout=3.05, read_timeout=30.0, max_retries=0):
+        """
+        Args:
+            pool_connections (int): Number of per-host pools kept by the default adapter.
+            pool_maxsize (int): Connections kept alive per host by default.
+            host_pool_sizes (dict): Host (optionally 'host:port') to pool size,
+                for hosts that need more or fewer connections than the default.
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait between bytes of the response.
+            max_retries (int): Connection-level retries, passed to HTTPAdapter.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.adapters = []
+        default_adapter = self.new_adapter(pool_connections, pool_maxsize, max_retries)
+        self.session.mount('http://', default_adapter)
+        self.session.mount('https://', default_adapter)
+        for host, size in (host_pool_sizes or {}).items():
+            adapter = self.new_adapter(1, size, max_retries)
+            # Prepared URLs always carry a path, so the trailing slash keeps
+            # 'api.example.com' from also matching 'api.example.com.evil'.
+            self.session.mount(f'http://{host}/', adapter)
+            self.session.mount(f'https://{host}/', adapter)
+
+    def new_adapter(self, pool_connections, pool_maxsize, max_retries):
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+        self.adapters.append(adapter)
+        return adapter
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data=data, **kwargs)
+
+    def pool_stats(self):
+        """
+        Report connection pool utilization.
+
+        Returns:
+            dict: 'pools' maps 'scheme://host:port' to its maxsize, idle
+                (open and ready for reuse) and in_use connections, and the
+                connections opened and requests sent over it; 'totals' sums
+                the last two.
+        """
+        pools = {}
+        for adapter in self.adapters:
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                queued = list(pool.pool.queue)
+                pools[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                    'maxsize': pool.pool.maxsize,
+                    'idle': sum(1 for connection in queued if connection is not None),
+                    'in_use': pool.pool.maxsize - len(queued),
+                    'connections_opened': pool.num_connections,
+                    'requests': pool.num_requests
+                }
+        return {
+            'pools': pools,
+            'totals': {
+                'connections_opened': sum(stats['connections_opened'] for stats in pools.values()),
+                'requests': sum(stats['requests'] for stats in pools.values())
+            }
+        }
+
+    def close(self):
+        self.session.close()
+
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+def get_shared_transport():
+    """Return the process-wide HTTPTransport, creating it on first use."""
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = HTTPTransport()
+        return _shared_transport
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+    return directives
+
+def parse_http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+class HTTPResponseCache:
+    """
+    Private HTTP cache for GET responses, following Cache-Control, Expires,
+    ETag and Last-Modified.
+
+    Entries are keyed by the prepared URL, query string included, and only
+    answer requests that match the request headers named in their Vary.
+    Fresh entries are served without a request. Stale entries with a
+    validator are revalidated with If-None-Match / If-Modified-Since, and a
+    304 refreshes the stored entry instead of downloading the body again.
+    Entries live in an in-memory LRU tier bounded by max_bytes and, when a
+    directory is given, in an on-disk tier bounded by max_disk_bytes that
+    survives restarts.
+    """
+
+    CACHEABLE_STATUS = (200, 203)
+    # transport.get keyword arguments the cache key accounts for; params are
+    # folded into the URL. Any other argument bypasses the cache.
+    KEYED_KWARGS = ('params', 'timeout')
+    # Hop-by-hop and body-encoding headers no longer describe the stored,
+    # already decoded content.
+    DROPPED_HEADERS = ('connection', 'keep-alive', 'transfer-encoding', 'content-encoding', 'content-length')
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, directory=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.disk = OrderedDict()
+        self.disk_bytes = 0
+        self.metrics_counts = {'hits': 0, 'misses': 0, 'revalidations': 0, 'stores': 0, 'evictions': 0,
+                              'bypasses': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # Rebuild the disk LRU order from modification times, which reads refresh.
+            entries = sorted((entry for entry in os.scandir(directory) if entry.name.endswith('.cache')),
+                             key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                self.disk[entry.name[:-len('.cache')]] = entry.stat().st_size
+                self.disk_bytes += entry.stat().st_size
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, transport, url, headers=None, **kwargs):
+        """
+        GET url through the cache.
+
+        Args:
+            transport: HTTPTransport (or anything with a requests-style get).
+            url (str): The URL to fetch.
+            headers (dict): Extra request headers, matched against the stored
+                response's Vary.
+            **kwargs: Passed through to transport.get. params are part of the
+                cache key; arguments other than params and timeout bypass the
+                cache.
+
+        Returns:
+            requests.Response: The origin response, or one rebuilt from the cache.
+        """
+        if set(kwargs) - set(self.KEYED_KWARGS):
+            # Auth, cookies, streaming and the like change the response in
+            # ways the cache key cannot see.
+            self.count('bypasses')
+            return transport.get(url, headers=headers, **kwargs)
+        url = requests.Request('GET', url, params=kwargs.pop('params', None)).prepare().url
+        key = self.key(url)
+        entry = self.lookup(key)
+        if entry is not None and (entry['url'] != url or not self.vary_matches(entry, headers)):
+            entry = None
+        if entry is not None and time.time() < entry['expires_at']:
+            self.count('hits')
+            return self.to_response(entry)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry['headers'].get('ETag'):
+                request_headers['If-None-Match'] = entry['headers']['ETag']
+            if entry['headers'].get('Last-Modified'):
+                request_headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        response = transport.get(url, headers=request_headers, **kwargs)
+        if entry is not None and response.status_code == 304:
+            self.count('revalidations')
+            # Other threads may be reading the cached entry; update a copy.
+            entry = dict(entry, headers=CaseInsensitiveDict(entry['headers']))
+            entry['headers'].update(self.stored_headers(response.headers))
+            entry['expires_at'] = self.expires_at(entry['headers'], time.time())
+            self.store(key, entry)
+            return self.to_response(entry)
+        self.count('misses')
+        now = time.time()
+        expires_at = self.expires_at(response.headers, now)
+        # An entry that is never fresh and has no validator could never be
+        # served or revalidated, so it would only push out useful entries.
+        if self.cacheable(response) and (expires_at > now or response.headers.get('ETag')
+                                         or response.headers.get('Last-Modified')):
+            request_headers = CaseInsensitiveDict(headers or {})
+            self.store(key, {
+                'url': url,
+                'status_code': response.status_code,
+                'headers': self.stored_headers(response.headers),
+                'vary': {name: request_headers.get(name) for name in self.vary_names(response.headers)},
+                'encoding': response.encoding,
+                'content': response.content,
+                'expires_at': expires_at
+            })
+        return response
+
+    @staticmethod
+    def vary_names(headers):
+        return [name.strip().lower() for name in headers.get('Vary', '').split(',') if name.strip()]
+
+    @staticmethod
+    def vary_matches(entry, headers):
+        # The stored response only answers requests that send the same values
+        # for the request headers its Vary names.
+        request_headers = CaseInsensitiveDict(headers or {})
+        return all(request_headers.get(name) == value for name, value in entry.get('vary', {}).items())
+
+    def cacheable(self, response):
+        if response.request is not None and response.request.method != 'GET':
+            return False
+        if response.status_code not in self.CACHEABLE_STATUS:
+            return False
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        return 'no-store' not in directives and response.headers.get('Vary', '').strip() != '*'
+
+    def stored_headers(self, headers):
+        return CaseInsensitiveDict({name: value for name, value in headers.items()
+                                    if name.lower() not in self.DROPPED_HEADERS})
+
+    @staticmethod
+    def expires_at(headers, response_time):
+        # Freshness lifetime from max-age, else Expires relative to Date; with
+        # neither, or with no-cache, the entry must be revalidated every time.
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-cache' in directives:
+            return response_time
+        try:
+            age = max(float(headers.get('Age') or 0), 0.0)
+        except ValueError:
+            age = 0.0
+        if 'max-age' in directives:
+            try:
+                return response_time + int(directives['max-age']) - age
+            except ValueError:
+                return response_time
+        expires = parse_http_date(headers.get('Expires'))
+        if expires is not None:
+            date = parse_http_date(headers.get('Date')) or response_time
+            return response_time + expires - date
+        return response_time
+
+    @staticmethod
+    def to_response(entry):
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = entry['encoding']
+        response._content = entry['content']
+        response.url = entry['url']
+        response.from_cache = True
+        return response
+
+    def entry_size(self, entry):
+        return len(entry['content']) + sum(len(name) + len(value) for name, value in entry['headers'].items())
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+                return entry
+            if key not in self.disk:
+                return None
+            self.disk.move_to_end(key)
+        path = os.path.join(self.directory, key + '.cache')
+        try:
+            # The cache directory is written only by this class and must not be shared.
+            with open(path, 'rb') as cache_file:
+                entry = pickle.load(cache_file)
+            os.utime(path)
+            entry['headers'] = CaseInsensitiveDict(entry['headers'])
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self.lock:
+                self.disk_bytes -= self.disk.pop(key, 0)
+            return None
+        self.store_in_memory(key, entry)
+        return entry
+
+    def store(self, key, entry):
+        self.count('stores')
+        self.store_in_memory(key, entry)
+        if self.directory:
+            self.store_on_disk(key, entry)
+
+    def store_in_memory(self, key, entry):
+        size = self.entry_size(entry)
+        with self.lock:
+            if key in self.memory:
+                self.memory_bytes -= self.entry_size(self.memory.pop(key))
+            if size > self.max_bytes:
+                return
+            self.memory[key] = entry
+            self.memory_bytes += size
+            while self.memory_bytes > self.max_bytes:
+                _, evicted = self.memory.popitem(last=False)
+                self.memory_bytes -= self.entry_size(evicted)
+                self.metrics_counts['evictions'] += 1
+
+    def store_on_disk(self, key, entry):
+        data = pickle.dumps(dict(entry, headers=dict(entry['headers'])), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_disk_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, os.path.join(self.directory, key + '.cache'))
+        evicted = []
+        with self.lock:
+            self.disk_bytes += len(data) - self.disk.pop(key, 0)
+            self.disk[key] = len(data)
+            while self.disk_bytes > self.max_disk_bytes:
+                old_key, old_size = self.disk.popitem(last=False)
+                self.disk_bytes -= old_size
+                self.metrics_counts['evictions'] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old_key + '.cache'))
+            except OSError:
+                pass
+
+    def count(self, name):
+        with self.lock:
+            self.metrics_counts[name] += 1
+
+    def metrics(self):
+        with self.lock:
+            return dict(self.metrics_counts, memory_entries=len(self.memory), memory_bytes=self.memory_bytes,
+                        disk_entries=len(self.disk), disk_bytes=self.disk_bytes)
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive handler for StandInHTTPServer that echoes the request as JSON.
+
+    GET /slow?delay=<seconds> waits before answering.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY, Nagle's
+    # algorithm holds the body back for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send_body(self, body, status=200, content_type='application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def echo(self):
+        url = urlsplit(self.path)
+        body = self.read_body()
+        if url.path == '/slow':
+            time.sleep(float(parse_qs(url.query).get('delay', ['1'])[0]))
+        self.send_body(json.dumps({'method': self.command, 'path': url.path, 'query': url.query,
+                                   'body': body.decode('utf-8', 'replace')}).encode())
+
+    do_GET = echo
+    do_POST = echo
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    """
+    Local HTTP server for tests and benchmarks, run in a background thread.
+
+    Counts accepted TCP connections, so connection reuse can be observed.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler_class=StandInRequestHandler):
+        super().__init__(('127.0.0.1', 0), handler_class)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.thread = threading.Thread(target=self.serve_forever, name='StandInHTTPServer', daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        self.server_close()
+
+def benchmark_transport(request_count=200):
+    """
+    Compare one connection per request, as the module-level requests.request
+    makes, with a pooled HTTPTransport, against a local StandInHTTPServer.
+
+    Returns:
+        dict: Per mode, elapsed seconds, requests per second and TCP connections opened.
+    """
+    results = {}
+    with StandInHTTPServer() as server:
+        url = f'{server.url}/echo'
+        transport = HTTPTransport()
+        modes = (('per_request', lambda: requests.request('GET', url, timeout=transport.timeout)),
+                 ('pooled', lambda: transport.get(url)))
+        for mode, send in modes:
+            connections_before = server.connections
+            start = time.perf_counter()
+            for _ in range(request_count):
+                send().json()
+            elapsed = time.perf_counter() - start
+            results[mode] = {
+                'seconds': elapsed,
+                'requests_per_second': request_count / elapsed,
+                'connections': server.connections - connections_before
+            }
+        transport.close()
+    return results
+
+class TestHTTPTransport(unittest.TestCase):
+    def test_reuses_connections_and_reports_pool_stats(self):
+        with StandInHTTPServer() as server:
+            host = server.url.split('//')[1]
+            transport = HTTPTransport(host_pool_sizes={host: 3})
+            for i in range(20):
+                self.assertEqual(transport.get(f'{server.url}/item', params={'i': i}).json()['query'], f'i={i}')
+            self.assertEqual(transport.post(f'{server.url}/item', data={'a': '1'}).json()['body'], 'a=1')
+            self.assertEqual(server.connections, 1)
+            stats = transport.pool_stats()
+            pool = stats['pools'][f'http://{host}']
+            self.assertEqual(pool['maxsize'], 3)
+            self.assertEqual(pool['idle'], 1)
+            self.assertEqual(pool['in_use'], 0)
+            self.assertEqual(stats['totals'], {'connections_opened': 1, 'requests': 21})
+            transport.close()
+
+    def test_read_timeout(self):
+        with StandInHTTPServer() as server:
+            transport = HTTPTransport(read_timeout=0.1)
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                transport.get(f'{server.url}/slow', params={'delay': 1})
+            self.assertEqual(transport.get(f'{server.url}/slow', params={'delay': 0.2}, timeout=2).status_code, 200)
+            transport.close()
+
+    def test_response_cache_honors_freshness_and_validators(self):
+        requested = []
+
+        class CachingHandler(StandInRequestHandler):
+            def do_GET(self):
+                requested.append(self.path)
+                validators = {'ETag': '"v1"', 'Last-Modified': 'Mon, 05 Oct 2026 10:00:00 GMT'}
+                if self.path == '/fresh':
+                    self.send_body(b'fresh', headers={'Cache-Control': 'max-age=60'})
+                elif self.path == '/etag' and self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                    self.send_header('ETag', '"v1"')
+                    self.end_headers()
+                elif self.path == '/etag':
+                    self.send_body(b'tagged', headers={'Cache-Control': 'no-cache', 'ETag': '"v1"'})
+                elif self.path == '/modified' and self.headers.get('If-Modified-Since') == validators['Last-Modified']:
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                elif self.path == '/modified':
+                    self.send_body(b'modified', headers={'Last-Modified': validators['Last-Modified']})
+                else:
+                    self.send_body(b'secret', headers={'Cache-Control': 'no-store', 'ETag': '"s"'})
+
+        with StandInHTTPServer(CachingHandler) as server, tempfile.TemporaryDirectory() as directory:
+            transport = HTTPTransport()
+            cache = HTTPResponseCache(directory=directory)
+            for _ in range(3):
+                for path in ('/fresh', '/etag', '/modified', '/private'):
+                    response = cache.get(transport, server.url + path)
+                    self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, 'secret')
+            self.assertEqual(requested.count('/fresh'), 1)
+            self.assertEqual(requested.count('/etag'), 3)
+            self.assertEqual(requested.count('/private'), 3)
+            self.assertEqual(cache.get(transport, server.url + '/etag').text, 'tagged')
+            metrics = cache.metrics()
+            self.assertEqual((metrics['hits'], metrics['revalidations'], metrics['memory_entries']), (2, 5, 3))
+            restarted = HTTPResponseCache(directory=directory)
+            self.assertEqual(restarted.metrics()['disk_entries'], 3)
+            self.assertTrue(restarted.get(transport, server.url + '/fresh').from_cache)
+            self.assertEqual(requested.count('/fresh'), 1)
+            transport.close()
+
+    def test_response_cache_keys_on_params_and_vary(self):
+        requested = []
+
+        class VaryingHandler(StandInRequestHandler):
+            def do_GET(self):
+                requested.append(self.path)
+                body = json.dumps({'path': self.path, 'language': self.headers.get('Accept-Language')}).encode()
+                if self.path.startswith('/plain'):
+                    self.send_body(body)
+                else:
+                    self.send_body(body, headers={'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language'})
+
+        with StandInHTTPServer(VaryingHandler) as server:
+            transport = HTTPTransport()
+            cache = HTTPResponseCache()
+            for i in (1, 2, 1):
+                self.assertEqual(cache.get(transport, server.url + '/item', params={'i': i}).json()['path'],
+                                 f'/item?i={i}')
+            self.assertEqual(requested.count('/item?i=1'), 1)
+            french = cache.get(transport, server.url + '/item', headers={'Accept-Language': 'fr'}, params={'i': 1})
+            self.assertEqual(french.json()['language'], 'fr')
+            self.assertEqual(requested.count('/item?i=1'), 2)
+            cache.get(transport, server.url + '/item', params={'i': 2}, cookies={'session': 'a'})
+            self.assertEqual(requested.count('/item?i=2'), 2)
+            cache.get(transport, server.url + '/plain')
+            metrics = cache.metrics()
+            self.assertEqual((metrics['hits'], metrics['stores'], metrics['bypasses']), (1, 3, 1))
+            self.assertEqual(metrics['memory_entries'], 2)
+            transport.close()
+
+    def test_response_cache_evicts_least_recently_used(self):
+        cache = HTTPResponseCache(max_bytes=250)
+        for name in ('a', 'b', 'c'):
+            cache.store_in_memory(name, {'url': name, 'headers': CaseInsensitiveDict(), 'content': b'x' * 100})
+        self.assertEqual(list(cache.memory), ['b', 'c'])
+        cache.lookup('b')
+        cache.store_in_memory('d', {'url': 'd', 'headers': CaseInsensitiveDict(), 'content': b'x' * 100})
+        self.assertEqual(list(cache.memory), ['b', 'd'])
+        self.assertEqual(cache.metrics()['evictions'], 2)
+
+    def test_benchmark_transport(self):
+        results = benchmark_transport(request_count=20)
+        self.assertEqual(results['per_request']['connections'], 20)
+        self.assertEqual(results['pooled']['connections'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,8 @@
 # Import necessary modules and libraries
-from self_modification_learning import SelfModificationLearningModule
+from self_modification_learning import SelfModificationLearningModule, BackgroundTrainer
 from api_integrations import APIIntegrationModule
 from advanced_nlp_nlu import AdvancedNLPNLU
-from memory_handling import MemoryHandlingModule
+from memory_handling import MemoryHandlingModule, MemoryStorage
 from real_time_interaction import RealTimeInteraction
 import logging
 import unittest
@@ -10,11 +10,16 @@ import unittest
 class IntegrationModule:
     def __init__(self):
         # Initialize modules
-        self.self_mod = SelfModificationLearningModule()
+        # Learning history beyond the in-memory window spills to SQLite instead of being dropped.
+        self.learning_storage = MemoryStorage()
+        self.self_mod = SelfModificationLearningModule(storage=self.learning_storage)
+        # Learning tasks are retrained in the background so requests never wait on a fit.
+        self.trainer = BackgroundTrainer(self.self_mod).start()
         self.api_int = APIIntegrationModule()
         self.nlp_nlu = AdvancedNLPNLU()
         self.mem_handle = MemoryHandlingModule()
-        self.real_time_int = RealTimeInteraction()
+        # Intent routing falls back to the classifier trained above.
+        self.real_time_int = RealTimeInteraction(intent_model=self.self_mod, intent_trainer=self.trainer)
 
     def distribute_task(self, task):
         """
@@ -28,7 +33,7 @@ class IntegrationModule:
         """
         task_type = task.get('type')
         if task_type == 'learning':
-            return self.self_mod.learn_from_interaction(task)
+            return self.trainer.submit(task)
         elif task_type == 'api':
             return self.api_int.handle_api_request(task)
         elif task_type == 'nlp':
@@ -96,9 +101,12 @@ class IntegrationModule:
 
     def monitor_interactions(self):
         """
-        Monitor module interactions (placeholder for monitoring logic).
+        Monitor module interactions.
+
+        Returns:
+            dict: Background training metrics, including model version and training lag.
         """
-        pass
+        return {'training': self.trainer.metrics()}
 
     def handle_feedback(self, feedback):
         """
@@ -1,54 +1,470 @@
 import sqlite3
+import threading
+import time
+import tempfile
+import os
+import random
+import calendar
+import queue
+from contextlib import contextmanager
+from datetime import datetime
 import unittest
 import logging
 from web_manipulation import WebManipulationModule
 from file_operations import FileOperationsModule
 
 class MemoryStorage:
-    def __init__(self, db_file='interactions.db'):
+    SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    SCHEMA_VERSION = 6
+    # Bucket widths, in seconds, of the materialized per-window frequency counts.
+    STAT_GRANULARITIES = {'hour': 3600, 'day': 86400}
+    INSERT_INTERACTION = "INSERT INTO interactions (timestamp, user_input, response) VALUES (?,?,?)"
+    # Timestamps are stored as integer epoch seconds and returned in the
+    # original 'YYYY-MM-DD HH:MM:SS' text form.
+    SELECT_INTERACTION = "SELECT datetime(timestamp, 'unixepoch'), user_input, response FROM interactions"
+
+    def __init__(self, db_file='interactions.db', buffered=False, flush_size=500, flush_interval=1.0,
+                 synchronous='NORMAL'):
         """
         Initialize the MemoryStorage with a SQLite database.
 
         Args:
             db_file (str): The SQLite database file path.
+            buffered (bool): Queue interactions in memory and write them in batches.
+            flush_size (int): Number of queued interactions that triggers a flush.
+            flush_interval (float): Maximum seconds a queued interaction waits before it is flushed.
+            synchronous (str): SQLite synchronous pragma, one of OFF, NORMAL, FULL or EXTRA.
 
         """
+        if synchronous.upper() not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown synchronous mode: {synchronous}")
+        self.db_file = db_file
+        self.buffered = buffered
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.write_buffer = []
+        self.lock = threading.RLock()
+        # The buffer has its own lock so queueing a row, or checking whether a
+        # read has anything to wait for, never waits on a write in progress.
+        # Rows are numbered as they are queued; committed_rows is the number
+        # durably written, so readers can wait for exactly the rows queued
+        # before them.
+        self.buffer_lock = threading.Lock()
+        self.buffer_committed = threading.Condition(self.buffer_lock)
+        self.queued_rows = 0
+        self.committed_rows = 0
+        self.flush_errors = 0
+        self.flush_requested = threading.Event()
+        self.closed = threading.Event()
+        self.flush_thread = None
         try:
-            self.conn = sqlite3.connect(db_file)
+            # The connection is shared with the flush thread, so every use of it
+            # is serialized through self.lock.
+            self.conn = sqlite3.connect(db_file, check_same_thread=False)
+            self.configure_connection(synchronous)
             self.create_table()
         except sqlite3.Error as e:
             self.handle_error(e)
+        if buffered:
+            self.flush_thread = threading.Thread(target=self.flush_loop, name='MemoryStorageFlush', daemon=True)
+            self.flush_thread.start()
+
+    def configure_connection(self, synchronous='NORMAL'):
+        """
+        Enable WAL journaling and set the synchronous pragma.
+
+        With WAL, NORMAL only syncs at checkpoints, which is durable against
+        application crashes and much cheaper than FULL's sync per commit.
+
+        Args:
+            synchronous (str): SQLite synchronous pragma value.
+
+        """
+        try:
+            with self.lock:
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute(f"PRAGMA synchronous={synchronous.upper()}")
+        except sqlite3.Error as e:
+            self.handle_error(e)
 
     def create_table(self):
         """
-        Create the 'interactions' table in the database if it doesn't exist.
+        Create the 'interactions' table, or upgrade an existing database to the current schema.
 
         """
         try:
+            self.migrate()
+        except sqlite3.Error as e:
+            self.handle_error(e)
+
+    def migrate(self):
+        """
+        Apply pending schema migrations in order, each in its own transaction.
+
+        The schema version is tracked in SQLite's user_version pragma, so
+        existing database files are upgraded in place when they are opened.
+
+        """
+        migrations = [
+            (1, self.migrate_to_v1),
+            (2, self.migrate_to_v2),
+            (3, self.migrate_to_v3),
+            (4, self.migrate_to_v4),
+            (5, self.migrate_to_v5),
+            (6, self.migrate_to_v6),
+        ]
+        with self.lock:
             c = self.conn.cursor()
-            c.execute('''CREATE TABLE IF NOT EXISTS interactions
-                         (timestamp TEXT, user_input TEXT, response TEXT)''')
-            self.conn.commit()
+            version = c.execute("PRAGMA user_version").fetchone()[0]
+            for target, migration in migrations:
+                if version >= target:
+                    continue
+                c.execute("BEGIN")
+                try:
+                    migration(c)
+                    c.execute(f"PRAGMA user_version={target}")
+                    self.conn.commit()
+                except sqlite3.Error:
+                    self.conn.rollback()
+                    raise
+                version = target
+
+    def migrate_to_v1(self, c):
+        """
+        Original schema: timestamps as TEXT, no key and no indexes.
+
+        """
+        c.execute('''CREATE TABLE IF NOT EXISTS interactions
+                     (timestamp TEXT, user_input TEXT, response TEXT)''')
+
+    def migrate_to_v2(self, c):
+        """
+        Add a rowid primary key, integer epoch timestamps and lookup indexes.
+
+        """
+        c.execute('''CREATE TABLE interactions_v2
+                     (id INTEGER PRIMARY KEY, timestamp INTEGER NOT NULL, user_input TEXT, response TEXT)''')
+        # Numeric text is already epoch seconds; anything else is parsed as an
+        # ISO-8601 date (treated as UTC). Unparseable values sort first as 0.
+        c.execute('''INSERT INTO interactions_v2 (timestamp, user_input, response)
+                     SELECT COALESCE(CASE WHEN typeof(timestamp) IN ('integer', 'real')
+                                               OR (timestamp <> '' AND timestamp NOT GLOB '*[^0-9.]*')
+                                          THEN CAST(timestamp AS INTEGER)
+                                          ELSE CAST(strftime('%s', timestamp) AS INTEGER) END, 0),
+                            user_input, response
+                     FROM interactions ORDER BY rowid''')
+        c.execute("DROP TABLE interactions")
+        c.execute("ALTER TABLE interactions_v2 RENAME TO interactions")
+        c.execute("CREATE INDEX idx_interactions_timestamp ON interactions (timestamp)")
+        c.execute("CREATE INDEX idx_interactions_user_input ON interactions (user_input)")
+
+    def migrate_to_v3(self, c):
+        """
+        Add frequency tables kept current by triggers on the interactions table.
+
+        """
+        c.execute('''CREATE TABLE interaction_counts
+                     (user_input TEXT PRIMARY KEY, count INTEGER NOT NULL)''')
+        c.execute("CREATE INDEX idx_interaction_counts_count ON interaction_counts (count)")
+        c.execute('''CREATE TABLE interaction_count_buckets
+                     (granularity INTEGER NOT NULL, bucket INTEGER NOT NULL, user_input TEXT NOT NULL,
+                      count INTEGER NOT NULL, PRIMARY KEY (granularity, bucket, user_input))''')
+        self.create_count_triggers(c)
+        self.rebuild_stats_tables(c)
+
+    def create_count_triggers(self, c):
+        increment = self.count_statements('NEW', +1)
+        decrement = self.count_statements('OLD', -1)
+        c.execute(f"""CREATE TRIGGER interactions_count_insert AFTER INSERT ON interactions
+                      BEGIN {increment} END""")
+        c.execute(f"""CREATE TRIGGER interactions_count_delete AFTER DELETE ON interactions
+                      BEGIN {decrement} END""")
+        c.execute(f"""CREATE TRIGGER interactions_count_update AFTER UPDATE OF timestamp, user_input ON interactions
+                      BEGIN {decrement} {increment} END""")
+
+    def migrate_to_v4(self, c):
+        """
+        Add an FTS5 index over user_input and response, kept in sync by triggers.
+
+        The index uses the interactions table as external content, so the text
+        is not stored twice; the migration backfills it for existing rows.
+
+        """
+        c.execute('''CREATE VIRTUAL TABLE interactions_fts USING fts5
+                     (user_input, response, content='interactions', content_rowid='id')''')
+        c.execute('''CREATE TRIGGER interactions_fts_insert AFTER INSERT ON interactions BEGIN
+                         INSERT INTO interactions_fts (rowid, user_input, response)
+                         VALUES (NEW.id, NEW.user_input, NEW.response);
+                     END''')
+        c.execute('''CREATE TRIGGER interactions_fts_delete AFTER DELETE ON interactions BEGIN
+                         INSERT INTO interactions_fts (interactions_fts, rowid, user_input, response)
+                         VALUES ('delete', OLD.id, OLD.user_input, OLD.response);
+                     END''')
+        c.execute('''CREATE TRIGGER interactions_fts_update AFTER UPDATE OF user_input, response ON interactions BEGIN
+                         INSERT INTO interactions_fts (interactions_fts, rowid, user_input, response)
+                         VALUES ('delete', OLD.id, OLD.user_input, OLD.response);
+                         INSERT INTO interactions_fts (rowid, user_input, response)
+                         VALUES (NEW.id, NEW.user_input, NEW.response);
+                     END''')
+        c.execute("INSERT INTO interactions_fts (interactions_fts) VALUES ('rebuild')")
+
+    def migrate_to_v5(self, c):
+        """
+        Add the table that older learning-module history is spilled to.
+
+        """
+        c.execute('''CREATE TABLE learning_history
+                     (id INTEGER PRIMARY KEY, text TEXT NOT NULL, label TEXT NOT NULL)''')
+
+    def migrate_to_v6(self, c):
+        """
+        Recreate the frequency triggers so their bucket cleanup uses the primary key.
+
+        """
+        for name in ('interactions_count_insert', 'interactions_count_delete', 'interactions_count_update'):
+            c.execute(f"DROP TRIGGER IF EXISTS {name}")
+        self.create_count_triggers(c)
+
+    def count_statements(self, row, delta):
+        """
+        Build the trigger body that applies one row's change to the frequency tables.
+
+        Args:
+            row (str): 'NEW' for inserted rows or 'OLD' for deleted rows.
+            delta (int): +1 or -1.
+
+        Returns:
+            str: Semicolon-terminated SQL statements.
+
+        """
+        statements = []
+        if delta > 0:
+            statements.append(f"""INSERT INTO interaction_counts (user_input, count)
+                                  SELECT {row}.user_input, 1 WHERE {row}.user_input IS NOT NULL
+                                  ON CONFLICT (user_input) DO UPDATE SET count = count + 1;""")
+            for seconds in self.STAT_GRANULARITIES.values():
+                statements.append(f"""INSERT INTO interaction_count_buckets (granularity, bucket, user_input, count)
+                                      SELECT {seconds}, {row}.timestamp / {seconds}, {row}.user_input, 1
+                                      WHERE {row}.user_input IS NOT NULL
+                                      ON CONFLICT (granularity, bucket, user_input) DO UPDATE SET count = count + 1;""")
+        else:
+            statements.append(f"""UPDATE interaction_counts SET count = count - 1
+                                  WHERE user_input = {row}.user_input;""")
+            statements.append(f"""DELETE FROM interaction_counts
+                                  WHERE user_input = {row}.user_input AND count <= 0;""")
+            for seconds in self.STAT_GRANULARITIES.values():
+                statements.append(f"""UPDATE interaction_count_buckets SET count = count - 1
+                                      WHERE granularity = {seconds} AND bucket = {row}.timestamp / {seconds}
+                                      AND user_input = {row}.user_input;""")
+                # Keyed on the full primary key so the cleanup is a point
+                # delete rather than a scan of every bucket.
+                statements.append(f"""DELETE FROM interaction_count_buckets
+                                      WHERE granularity = {seconds} AND bucket = {row}.timestamp / {seconds}
+                                      AND user_input = {row}.user_input AND count <= 0;""")
+        return ' '.join(statements)
+
+    def rebuild_stats_tables(self, c):
+        """
+        Recompute the frequency tables from the interactions table.
+
+        """
+        c.execute("DELETE FROM interaction_counts")
+        c.execute("DELETE FROM interaction_count_buckets")
+        c.execute('''INSERT INTO interaction_counts (user_input, count)
+                     SELECT user_input, COUNT(*) FROM interactions
+                     WHERE user_input IS NOT NULL GROUP BY user_input''')
+        for seconds in self.STAT_GRANULARITIES.values():
+            c.execute('''INSERT INTO interaction_count_buckets (granularity, bucket, user_input, count)
+                         SELECT ?, timestamp / ?, user_input, COUNT(*) FROM interactions
+                         WHERE user_input IS NOT NULL GROUP BY timestamp / ?, user_input''',
+                      (seconds, seconds, seconds))
+
+    def rebuild_interaction_stats(self):
+        """
+        Rebuild the materialized frequency statistics in one transaction.
+
+        Only needed if the tables were modified outside of this class with the
+        triggers dropped; databases from older versions are rebuilt on upgrade.
+
+        """
+        self.flush()
+        try:
+            with self.lock:
+                c = self.conn.cursor()
+                c.execute("BEGIN")
+                try:
+                    self.rebuild_stats_tables(c)
+                    self.conn.commit()
+                except sqlite3.Error:
+                    self.conn.rollback()
+                    raise
+        except sqlite3.Error as e:
+            self.handle_error(e)
+
+    def rebuild_search_index(self):
+        """
+        Rebuild the full-text index from the interactions table.
+
+        """
+        self.flush()
+        try:
+            with self.lock:
+                with self.conn:
+                    self.conn.execute("INSERT INTO interactions_fts (interactions_fts) VALUES ('rebuild')")
         except sqlite3.Error as e:
             self.handle_error(e)
 
+    @staticmethod
+    def to_epoch(timestamp):
+        """
+        Convert a timestamp to integer epoch seconds.
+
+        Args:
+            timestamp (str, int, float or datetime): Epoch seconds, an ISO-8601 string or a datetime.
+                Naive values are treated as UTC.
+
+        Returns:
+            int: Seconds since the Unix epoch.
+
+        """
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is not None:
+                return int(timestamp.timestamp())
+            return calendar.timegm(timestamp.timetuple())
+        if isinstance(timestamp, (int, float)):
+            return int(timestamp)
+        text = str(timestamp).strip()
+        try:
+            return int(float(text))
+        except ValueError:
+            return MemoryStorage.to_epoch(datetime.fromisoformat(text.replace('Z', '+00:00')))
+
     def store_interaction(self, timestamp, user_input, response):
         """
         Store an interaction in the database.
 
         Args:
-            timestamp (str): The timestamp of the interaction.
+            timestamp (str, int or datetime): The timestamp of the interaction.
             user_input (str): The user's input.
             response (str): The system's response.
 
         """
         try:
-            c = self.conn.cursor()
-            c.execute("INSERT INTO interactions VALUES (?,?,?)", (timestamp, user_input, response))
-            self.conn.commit()
+            row = (self.to_epoch(timestamp), user_input, response)
+        except ValueError as e:
+            self.handle_error(e)
+            return
+        if self.buffered:
+            with self.buffer_lock:
+                self.write_buffer.append(row)
+                self.queued_rows += 1
+                if len(self.write_buffer) >= self.flush_size:
+                    self.flush_requested.set()
+            return
+        try:
+            with self.lock:
+                c = self.conn.cursor()
+                c.execute(self.INSERT_INTERACTION, row)
+                self.conn.commit()
         except sqlite3.Error as e:
             self.handle_error(e)
 
+    def flush(self):
+        """
+        Write all queued interactions in a single transaction.
+
+        """
+        if not self.buffered:
+            return
+        with self.lock:
+            with self.buffer_lock:
+                if not self.write_buffer:
+                    return
+                rows, self.write_buffer = self.write_buffer, []
+                target = self.queued_rows
+            try:
+                with self.conn:
+                    self.conn.executemany(self.INSERT_INTERACTION, rows)
+            except sqlite3.Error as e:
+                with self.buffer_committed:
+                    # Keep the rows queued so the next flush retries them.
+                    self.write_buffer[:0] = rows
+                    self.flush_errors += 1
+                    self.buffer_committed.notify_all()
+                self.handle_error(e)
+                return
+            with self.buffer_committed:
+                self.committed_rows = max(self.committed_rows, target)
+                self.buffer_committed.notify_all()
+
+    def wait_for_buffered_writes(self):
+        """
+        Make interactions queued so far visible to a read that follows.
+
+        Returns immediately, without touching the writer lock, when everything
+        queued is already committed. Otherwise the flush thread is asked to
+        commit and the caller waits for it, or for that flush to fail.
+
+        """
+        if not self.buffered:
+            return
+        with self.buffer_committed:
+            target = self.queued_rows
+            if self.committed_rows >= target:
+                return
+            if self.flush_thread is None:
+                flush_inline = True
+            else:
+                flush_inline = False
+                errors = self.flush_errors
+                self.flush_requested.set()
+                self.buffer_committed.wait_for(
+                    lambda: self.committed_rows >= target or self.flush_errors != errors)
+        if flush_inline:
+            self.flush()
+
+    def flush_loop(self):
+        """
+        Background loop that flushes on the size or time threshold until closed.
+
+        """
+        while not self.closed.is_set():
+            self.flush_requested.wait(self.flush_interval)
+            self.flush_requested.clear()
+            self.flush()
+
+    def close(self):
+        """
+        Stop the flush thread, write any queued interactions and close the database.
+
+        """
+        self.closed.set()
+        self.flush_requested.set()
+        if self.flush_thread is not None:
+            self.flush_thread.join()
+            self.flush_thread = None
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    @contextmanager
+    def reader(self):
+        """
+        Yield a connection for read-only queries.
+
+        The base storage reads through its single connection under the lock;
+        PooledMemoryStorage hands out dedicated reader connections instead.
+
+        """
+        with self.lock:
+            yield self.conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def retrieve_interaction(self, timestamp):
         """
         Retrieve an interaction based on its timestamp.
@@ -60,11 +476,13 @@ class MemoryStorage:
             tuple or None: The retrieved interaction as a tuple (timestamp, user_input, response), or None if not found.
 
         """
+        self.wait_for_buffered_writes()
         try:
-            c = self.conn.cursor()
-            c.execute("SELECT * FROM interactions WHERE timestamp=?", (timestamp,))
-            return c.fetchone()
-        except sqlite3.Error as e:
+            with self.reader() as conn:
+                c = conn.cursor()
+                c.execute(self.SELECT_INTERACTION + " WHERE timestamp=?", (self.to_epoch(timestamp),))
+                return c.fetchone()
+        except (sqlite3.Error, ValueError) as e:
             self.handle_error(e)
             return None
 
@@ -76,11 +494,13 @@ class MemoryStorage:
             timestamp (str): The timestamp of the interaction to delete.
 
         """
+        self.flush()
         try:
-            c = self.conn.cursor()
-            c.execute("DELETE FROM interactions WHERE timestamp=?", (timestamp,))
-            self.conn.commit()
-        except sqlite3.Error as e:
+            with self.lock:
+                c = self.conn.cursor()
+                c.execute("DELETE FROM interactions WHERE timestamp=?", (self.to_epoch(timestamp),))
+                self.conn.commit()
+        except (sqlite3.Error, ValueError) as e:
             self.handle_error(e)
 
     def retrieve_recent_interactions(self, num_interactions):
@@ -94,10 +514,12 @@ class MemoryStorage:
             list: A list of tuples representing recent interactions.
 
         """
+        self.wait_for_buffered_writes()
         try:
-            c = self.conn.cursor()
-            c.execute("SELECT * FROM interactions ORDER BY timestamp DESC LIMIT ?", (num_interactions,))
-            return c.fetchall()
+            with self.reader() as conn:
+                c = conn.cursor()
+                c.execute(self.SELECT_INTERACTION + " ORDER BY timestamp DESC, id DESC LIMIT ?", (num_interactions,))
+                return c.fetchall()
         except sqlite3.Error as e:
             self.handle_error(e)
             return []
@@ -106,18 +528,153 @@ class MemoryStorage:
         """
         Analyze interactions by counting occurrences of user inputs.
 
+        Counts are read from the materialized interaction_counts table rather
+        than aggregated over the full history.
+
         Returns:
             list: A list of tuples containing user inputs and their occurrence counts.
 
         """
+        self.wait_for_buffered_writes()
         try:
-            c = self.conn.cursor()
-            c.execute("SELECT user_input, COUNT(*) FROM interactions GROUP BY user_input ORDER BY COUNT(*) DESC")
-            return c.fetchall()
+            with self.reader() as conn:
+                c = conn.cursor()
+                c.execute("SELECT user_input, count FROM interaction_counts ORDER BY count DESC")
+                return c.fetchall()
+        except sqlite3.Error as e:
+            self.handle_error(e)
+            return []
+
+    def top_interactions(self, k=10, granularity=None, start=None, end=None):
+        """
+        Return the K most frequent user inputs, overall or within a time window.
+
+        Args:
+            k (int): Number of user inputs to return.
+            granularity (str): None for all-time counts, or 'hour' / 'day' to count
+                within the buckets covering [start, end].
+            start (str, int or datetime): Start of the window. Defaults to the bucket containing end.
+            end (str, int or datetime): End of the window. Defaults to now.
+
+        Returns:
+            list: A list of (user_input, count) tuples, most frequent first.
+
+        """
+        if granularity is not None and granularity not in self.STAT_GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        self.wait_for_buffered_writes()
+        try:
+            with self.reader() as conn:
+                c = conn.cursor()
+                if granularity is None:
+                    c.execute("SELECT user_input, count FROM interaction_counts ORDER BY count DESC LIMIT ?", (k,))
+                    return c.fetchall()
+                seconds = self.STAT_GRANULARITIES[granularity]
+                end_epoch = self.to_epoch(end) if end is not None else int(time.time())
+                start_epoch = self.to_epoch(start) if start is not None else end_epoch
+                c.execute('''SELECT user_input, SUM(count) AS total FROM interaction_count_buckets
+                             WHERE granularity = ? AND bucket BETWEEN ? AND ?
+                             GROUP BY user_input ORDER BY total DESC LIMIT ?''',
+                          (seconds, start_epoch // seconds, end_epoch // seconds, k))
+                return c.fetchall()
+        except (sqlite3.Error, ValueError) as e:
+            self.handle_error(e)
+            return []
+
+    def search_interactions(self, query, limit=10, raw=False):
+        """
+        Full-text search over user inputs and responses, ranked by BM25.
+
+        Args:
+            query (str): Words to search for. Every word must match.
+            limit (int): Maximum number of results.
+            raw (bool): Pass the query through as FTS5 syntax (phrases, OR, prefix*) instead of plain words.
+
+        Returns:
+            list: A list of tuples (timestamp, user_input, response, snippet, score), best match first.
+
+        """
+        if not raw:
+            query = ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not query:
+            return []
+        self.wait_for_buffered_writes()
+        try:
+            with self.reader() as conn:
+                c = conn.cursor()
+                c.execute('''SELECT datetime(i.timestamp, 'unixepoch'), i.user_input, i.response,
+                                    snippet(interactions_fts, -1, '[', ']', '...', 12),
+                                    -bm25(interactions_fts) AS score
+                             FROM interactions_fts JOIN interactions i ON i.id = interactions_fts.rowid
+                             WHERE interactions_fts MATCH ?
+                             ORDER BY bm25(interactions_fts) LIMIT ?''', (query, limit))
+                return c.fetchall()
         except sqlite3.Error as e:
             self.handle_error(e)
             return []
 
+    def store_learning_records(self, records):
+        """
+        Append learning-history records in a single transaction.
+
+        Args:
+            records (list): A list of (text, label) tuples, oldest first.
+
+        Returns:
+            bool: True once the records are committed, False if the write failed.
+
+        """
+        try:
+            with self.lock:
+                with self.conn:
+                    self.conn.executemany("INSERT INTO learning_history (text, label) VALUES (?,?)", records)
+            return True
+        except sqlite3.Error as e:
+            self.handle_error(e)
+            return False
+
+    def count_learning_records(self):
+        """
+        Count the spilled learning-history records.
+
+        Returns:
+            int: Number of records in the learning_history table.
+
+        """
+        try:
+            with self.reader() as conn:
+                return conn.execute("SELECT COUNT(*) FROM learning_history").fetchone()[0]
+        except sqlite3.Error as e:
+            self.handle_error(e)
+            return 0
+
+    def iter_learning_records(self, batch_size=1000):
+        """
+        Iterate over the spilled learning history in insertion order.
+
+        Pages by primary key, so only one batch is held in memory at a time.
+
+        Args:
+            batch_size (int): Number of records fetched per query.
+
+        Yields:
+            list: Lists of up to batch_size (text, label) tuples.
+
+        """
+        last_id = 0
+        while True:
+            try:
+                with self.reader() as conn:
+                    rows = conn.execute("SELECT id, text, label FROM learning_history WHERE id > ? ORDER BY id LIMIT ?",
+                                        (last_id, batch_size)).fetchall()
+            except sqlite3.Error as e:
+                self.handle_error(e)
+                return
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [(text, label) for _, text, label in rows]
+
     def handle_error(self, error):
         """
         Handle errors gracefully and log them.
@@ -128,6 +685,117 @@ class MemoryStorage:
         """
         logging.error(f"An error occurred: {error}")
 
+class PooledMemoryStorage(MemoryStorage):
+    def __init__(self, db_file='interactions.db', max_readers=4, **kwargs):
+        """
+        MemoryStorage that can be shared by many threads.
+
+        All writes go through one dedicated writer connection serialized by the
+        lock. Reads borrow one of up to max_readers reader connections, so with
+        WAL journaling they run concurrently with each other and with an
+        in-progress write, seeing the last committed state.
+
+        Args:
+            db_file (str): The SQLite database file path. In-memory databases cannot be pooled.
+            max_readers (int): Maximum number of reader connections.
+            **kwargs: Passed through to MemoryStorage.
+
+        """
+        if db_file == ':memory:':
+            raise ValueError("PooledMemoryStorage needs a database file; ':memory:' cannot be shared")
+        self.max_readers = max_readers
+        self.idle_readers = queue.LifoQueue()
+        self.reader_count = 0
+        self.reader_count_lock = threading.Lock()
+        super().__init__(db_file, **kwargs)
+
+    def open_reader(self):
+        """
+        Open a new read-only connection to the database.
+
+        """
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow a reader connection from the pool, opening one if under max_readers.
+
+        """
+        try:
+            conn = self.idle_readers.get_nowait()
+        except queue.Empty:
+            with self.reader_count_lock:
+                create = self.reader_count < self.max_readers
+                if create:
+                    self.reader_count += 1
+            if create:
+                try:
+                    conn = self.open_reader()
+                except sqlite3.Error:
+                    with self.reader_count_lock:
+                        self.reader_count -= 1
+                    raise
+            else:
+                conn = self.idle_readers.get()
+        try:
+            yield conn
+        finally:
+            self.idle_readers.put(conn)
+
+    def close(self):
+        """
+        Close the writer as in MemoryStorage, then every reader connection.
+
+        """
+        super().close()
+        while True:
+            try:
+                self.idle_readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+def benchmark_interaction_queries(sizes=(10_000, 100_000, 1_000_000, 10_000_000), queries=1000, recent=20):
+    """
+    Time point lookups and recent-N queries as the interactions table grows.
+
+    With the timestamp index both queries are O(log n), so the per-query
+    latency should stay flat from the smallest to the largest size.
+
+    Args:
+        sizes (tuple): Table sizes at which to measure, in increasing order.
+        queries (int): Number of queries timed at each size.
+        recent (int): N for the recent-N query.
+
+    Returns:
+        list: One dict per size with mean seconds per point lookup and per recent-N query.
+
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryStorage(os.path.join(tmp, 'benchmark.db'), synchronous='OFF')
+        base = 1_600_000_000
+        rows = 0
+        for size in sizes:
+            with memory.lock, memory.conn:
+                memory.conn.executemany(memory.INSERT_INTERACTION,
+                                        ((base + i, f'input {i % 5000}', 'response') for i in range(rows, size)))
+            rows = size
+            lookups = [base + random.randrange(size) for _ in range(queries)]
+            start = time.perf_counter()
+            for timestamp in lookups:
+                memory.retrieve_interaction(timestamp)
+            lookup_seconds = (time.perf_counter() - start) / queries
+            start = time.perf_counter()
+            for _ in range(queries):
+                memory.retrieve_recent_interactions(recent)
+            recent_seconds = (time.perf_counter() - start) / queries
+            results.append({'rows': size, 'point_lookup_seconds': lookup_seconds, 'recent_seconds': recent_seconds})
+        memory.close()
+    return results
+
 class TestMemoryHandling(unittest.TestCase):
     def test_store_interaction(self):
         memory = MemoryStorage(':memory:')  # Use in-memory database for testing
@@ -148,5 +816,176 @@ class TestMemoryHandling(unittest.TestCase):
         retrieved_interaction = memory.retrieve_interaction(timestamp)
         self.assertIsNone(retrieved_interaction)
 
+    def test_buffered_writes_are_visible_to_reads(self):
+        memory = MemoryStorage(':memory:', buffered=True, flush_size=100, flush_interval=60)
+        memory.store_interaction('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')
+        self.assertEqual(len(memory.write_buffer), 1)
+        self.assertEqual(memory.retrieve_interaction('2023-11-05 13:30:00'),
+                         ('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!'))
+        self.assertEqual(memory.write_buffer, [])
+        memory.close()
+
+    def test_buffered_flush_on_size_threshold(self):
+        memory = MemoryStorage(':memory:', buffered=True, flush_size=10, flush_interval=60)
+        for i in range(10):
+            memory.store_interaction(f'2023-11-05 13:30:{i:02d}', 'Hello, Alt!', 'Hi there!')
+        deadline = time.time() + 5
+        while memory.write_buffer and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(memory.write_buffer, [])
+        memory.close()
+
+    def test_close_makes_buffered_writes_durable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, 'interactions.db')
+            with MemoryStorage(db_file, buffered=True, flush_interval=60, synchronous='FULL') as memory:
+                memory.store_interaction('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')
+            memory = MemoryStorage(db_file)
+            self.assertEqual(len(memory.retrieve_recent_interactions(10)), 1)
+            memory.close()
+
+    def test_frequency_stats_track_inserts_and_deletes(self):
+        memory = MemoryStorage(':memory:')
+        memory.store_interaction('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')
+        memory.store_interaction('2023-11-05 13:45:00', 'Hello, Alt!', 'Hi again!')
+        memory.store_interaction('2023-11-05 15:00:00', 'Weather?', 'Sunny')
+        memory.store_interaction('2023-11-06 09:00:00', 'Weather?', 'Rainy')
+        memory.store_interaction('2023-11-06 09:10:00', 'Weather?', 'Rainy')
+        self.assertEqual(memory.analyze_interactions(), [('Weather?', 3), ('Hello, Alt!', 2)])
+        self.assertEqual(memory.top_interactions(1), [('Weather?', 3)])
+        self.assertEqual(memory.top_interactions(5, 'hour', '2023-11-05 13:00:00', '2023-11-05 13:59:59'),
+                         [('Hello, Alt!', 2)])
+        self.assertEqual(memory.top_interactions(5, 'day', '2023-11-05 00:00:00', '2023-11-05 23:59:59'),
+                         [('Hello, Alt!', 2), ('Weather?', 1)])
+        memory.delete_interaction('2023-11-06 09:00:00')
+        memory.delete_interaction('2023-11-06 09:10:00')
+        self.assertEqual(memory.top_interactions(5, 'day', '2023-11-06 00:00:00', '2023-11-06 23:59:59'), [])
+        self.assertEqual(memory.analyze_interactions(), [('Hello, Alt!', 2), ('Weather?', 1)])
+        memory.rebuild_interaction_stats()
+        self.assertEqual(memory.analyze_interactions(), [('Hello, Alt!', 2), ('Weather?', 1)])
+
+    def test_search_interactions(self):
+        memory = MemoryStorage(':memory:')
+        memory.store_interaction('2023-11-05 13:30:00', 'Find the nearest coffee shop', 'Blue Bottle is 200m away')
+        memory.store_interaction('2023-11-05 13:31:00', 'Book an appointment with the dentist', 'Booked for Monday')
+        memory.store_interaction('2023-11-05 13:32:00', 'Is the coffee shop open?', 'Yes, until 6pm')
+        results = memory.search_interactions('coffee shop')
+        self.assertEqual(len(results), 2)
+        self.assertIn('[coffee]', results[0][3])
+        self.assertGreaterEqual(results[0][4], results[1][4])
+        self.assertEqual(memory.search_interactions('dentist')[0][2], 'Booked for Monday')
+        self.assertEqual(memory.search_interactions('"unbalanced'), [])
+        memory.delete_interaction('2023-11-05 13:31:00')
+        self.assertEqual(memory.search_interactions('dentist'), [])
+
+    def test_upgrades_legacy_database_in_place(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, 'interactions.db')
+            legacy = sqlite3.connect(db_file)
+            legacy.execute("CREATE TABLE interactions (timestamp TEXT, user_input TEXT, response TEXT)")
+            legacy.executemany("INSERT INTO interactions VALUES (?,?,?)", [
+                ('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!'),
+                ('2023-11-05 13:31:00', 'Bye', 'See you'),
+            ])
+            legacy.commit()
+            legacy.close()
+            memory = MemoryStorage(db_file)
+            self.assertEqual(memory.conn.execute("PRAGMA user_version").fetchone()[0], MemoryStorage.SCHEMA_VERSION)
+            self.assertEqual(memory.retrieve_interaction('2023-11-05 13:30:00'),
+                             ('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!'))
+            self.assertEqual(memory.retrieve_recent_interactions(1), [('2023-11-05 13:31:00', 'Bye', 'See you')])
+            self.assertCountEqual(memory.top_interactions(), [('Bye', 1), ('Hello, Alt!', 1)])
+            self.assertEqual(memory.search_interactions('see')[0][1], 'Bye')
+            memory.close()
+
+    def test_pooled_reads_run_during_open_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = PooledMemoryStorage(os.path.join(tmp, 'interactions.db'), max_readers=2)
+            memory.store_interaction('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')
+            with memory.lock:
+                memory.conn.execute("BEGIN IMMEDIATE")
+                memory.conn.execute(memory.INSERT_INTERACTION, (0, 'uncommitted', ''))
+                reads = []
+                reader = threading.Thread(target=lambda: reads.append(memory.retrieve_recent_interactions(10)))
+                reader.start()
+                reader.join(5)
+                self.assertFalse(reader.is_alive())
+                memory.conn.rollback()
+            self.assertEqual(reads, [[('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')]])
+            memory.close()
+
+    def test_buffered_pooled_reads_run_during_open_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = PooledMemoryStorage(os.path.join(tmp, 'interactions.db'), max_readers=2, buffered=True,
+                                         flush_size=100, flush_interval=60)
+            memory.store_interaction('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')
+            self.assertEqual(len(memory.retrieve_recent_interactions(10)), 1)
+            with memory.lock:
+                memory.conn.execute("BEGIN IMMEDIATE")
+                memory.conn.execute(memory.INSERT_INTERACTION, (0, 'uncommitted', ''))
+                reads = []
+
+                def read():
+                    reads.append(memory.retrieve_recent_interactions(10))
+                    reads.append(memory.top_interactions())
+
+                reader = threading.Thread(target=read)
+                reader.start()
+                reader.join(5)
+                self.assertFalse(reader.is_alive())
+                memory.conn.rollback()
+            self.assertEqual(reads, [[('2023-11-05 13:30:00', 'Hello, Alt!', 'Hi there!')], [('Hello, Alt!', 1)]])
+            memory.close()
+
+    def test_pooled_storage_stress(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = PooledMemoryStorage(os.path.join(tmp, 'interactions.db'), max_readers=4, buffered=True,
+                                         flush_size=50, flush_interval=0.05)
+            errors = []
+            memory.handle_error = errors.append
+            writers, rows_per_writer = 8, 200
+
+            def write(worker):
+                for i in range(rows_per_writer):
+                    memory.store_interaction(1_700_000_000 + worker * rows_per_writer + i, f'input {i % 10}', 'ok')
+
+            def read():
+                for _ in range(100):
+                    memory.retrieve_recent_interactions(5)
+                    memory.top_interactions(3)
+                    memory.search_interactions('input')
+
+            threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+            threads += [threading.Thread(target=read) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertLessEqual(memory.reader_count, 4)
+            self.assertEqual(sum(count for _, count in memory.analyze_interactions()), writers * rows_per_writer)
+            memory.close()
+
+    def test_queries_use_indexes(self):
+        memory = MemoryStorage(':memory:')
+        plans = {
+            'lookup': "SELECT * FROM interactions WHERE timestamp=1",
+            'recent': "SELECT * FROM interactions ORDER BY timestamp DESC, id DESC LIMIT 5",
+            'by_input': "SELECT * FROM interactions WHERE user_input='Hello'",
+        }
+        for name, query in plans.items():
+            plan = ' '.join(row[-1] for row in memory.conn.execute("EXPLAIN QUERY PLAN " + query))
+            self.assertIn('USING INDEX', plan, name)
+        # Trigger bodies cannot be explained directly; explain each bucket
+        # cleanup with literal values in place of the OLD row.
+        for statement in memory.count_statements('OLD', -1).split(';'):
+            if 'DELETE FROM interaction_count_buckets' in statement:
+                statement = statement.replace('OLD.timestamp', '1700000000').replace('OLD.user_input', "'Hello'")
+                plan = ' '.join(row[-1] for row in memory.conn.execute("EXPLAIN QUERY PLAN " + statement))
+                self.assertIn('granularity=? AND bucket=? AND user_input=?', plan)
+                self.assertNotIn('SCAN', plan)
+        results = benchmark_interaction_queries(sizes=(1_000, 10_000), queries=50)
+        self.assertEqual([r['rows'] for r in results], [1_000, 10_000])
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,28 @@
 import logging
 from web_manipulation import WebManipulationModule
 from file_operations import FileOperationsModule
-from advanced_nlp_nlu import AdvancedNLPNLU
+from advanced_nlp_nlu import AdvancedNLPNLU, learned_intent_fallback
+from self_modification_learning import SelfModificationLearningModule, BackgroundTrainer
 
 class RealTimeInteraction:
-    def __init__(self):
+    def __init__(self, openai_api_key=None, intent_model=None, intent_trainer=None):
         self.web_module = WebManipulationModule()
         self.file_module = FileOperationsModule()
-        self.nlp_nlu = AdvancedNLPNLU()
+        # Utterances no routing rule matches are classified by the learned
+        # model. Rule-routed utterances are submitted to intent_trainer as
+        # labeled examples; without an injected model, a private one is
+        # trained in the background. The model answers None until its first
+        # retrain.
+        if intent_model is None:
+            intent_model = SelfModificationLearningModule()
+            intent_trainer = intent_trainer if intent_trainer else BackgroundTrainer(intent_model).start()
+        self.intent_model = intent_model
+        self.intent_trainer = intent_trainer
+        self.nlp_nlu = AdvancedNLPNLU(openai_api_key, intent_fallback=learned_intent_fallback(self.intent_model),
+                                      intent_examples=self.submit_intent_example if intent_trainer else None)
+
+    def submit_intent_example(self, text, label):
+        self.intent_trainer.submit({'text': text, 'label': label})
 
     def manage_task(self, task):
         """
@@ -19,8 +34,7 @@ class RealTimeInteraction:
         Returns:
             tuple: A tuple containing intent and entities.
         """
-        doc = self.nlp_nlu.process_text(task)
-        intent, entities = self.extract_intent_entities(doc)
+        intent, entities = self.extract_intent_entities(task)
         return intent, entities
 
     def execute_task(self, intent, entities):
@@ -32,8 +46,11 @@ class RealTimeInteraction:
             entities (list): List of extracted entities.
 
         Returns:
-            str: The result of task execution.
+            str: The result of task execution, or None if no intent was recognized.
         """
+        if intent is None:
+            logging.info("No intent recognized for the task; nothing to execute")
+            return None
         if intent == 'find_information':
             result = self.web_module.find_information(entities)
         elif intent == 'book_appointment':
@@ -70,18 +87,22 @@ class RealTimeInteraction:
         self.web_module.handle_error(error)
         self.file_module.handle_error(error)
 
-    def extract_intent_entities(self, doc):
+    def extract_intent_entities(self, text):
         """
-        Enhanced algorithm for extracting intent and entities using advanced NLP techniques.
+        Route the task with the compiled intent rules and extract its entities.
+
+        The rule matcher works on tokens alone, so routing does not wait for the
+        dependency parse; the learned fallback is only consulted when no rule fires.
         
         Args:
-            doc (object): Processed NLP document.
+            text (str): User input task.
 
         Returns:
             tuple: A tuple containing intent and entities.
         """
-        intent = self.nlp_nlu.extract_intent(doc)
-        entities = self.nlp_nlu.extract_entities(doc)
+        intent, confidence = self.nlp_nlu.classify_intent(text)
+        logging.debug(f"Routed task to intent {intent} (confidence {confidence:.2f})")
+        entities = self.nlp_nlu.extract_entities(text)
         return intent, entities
 
     def analyze_feedback(self, feedback):
@@ -1,30 +1,379 @@
 from sklearn.svm import SVC
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.preprocessing import LabelEncoder
 from sklearn.linear_model import SGDClassifier
 import sympy as sp
 import logging
+import os
+import copy
+import queue
+import random
+import tempfile
+import threading
+import multiprocessing
+from multiprocessing.connection import wait as connection_wait
+from concurrent.futures import Future, CancelledError, InvalidStateError, as_completed
+import joblib
+from array import array
+from collections import namedtuple, OrderedDict
+from sklearn.base import clone
+from sklearn.exceptions import NotFittedError
+from sklearn.utils.validation import check_is_fitted
+import time
 import unittest
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 import requests
 
+SNAPSHOT_FORMAT_VERSION = 1
+
+def save_model_snapshot(path, kind, state):
+    """
+    Write a versioned model snapshot atomically.
+
+    The snapshot is an uncompressed joblib file, so every NumPy array in it
+    (classifier weights, idf vectors, support vectors) can later be loaded
+    memory-mapped instead of copied.
+    """
+    payload = {'format_version': SNAPSHOT_FORMAT_VERSION, 'kind': kind, 'state': state}
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def load_model_snapshot(path, kind, mmap_mode='c'):
+    """
+    Load a snapshot written by save_model_snapshot.
+
+    With mmap_mode='c' the arrays are mapped copy-on-write: worker processes
+    share the file's pages until one of them updates its weights.
+    """
+    payload = joblib.load(path, mmap_mode=mmap_mode)
+    if payload.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {payload.get('format_version')}")
+    if payload.get('kind') != kind:
+        raise ValueError(f"Snapshot holds a {payload.get('kind')}, not a {kind}")
+    return payload['state']
+
+class OnlineTextClassifier:
+    """
+    Streaming text classifier: a stateless hashing vectorizer feeding an
+    SGDClassifier trained with partial_fit.
+
+    Labels are mapped to integer codes as they first appear. The classifier is
+    allocated with spare class slots, and when a new label needs more, the
+    weight matrix grows by zero rows instead of being retrained.
+    """
+
+    def __init__(self, vectorizer=None, n_features=2 ** 18, initial_capacity=4, **sgd_params):
+        self.vectorizer = vectorizer if vectorizer else HashingVectorizer(n_features=n_features, alternate_sign=False)
+        self.clf = SGDClassifier(**sgd_params)
+        self.labels = []
+        self.label_codes = {}
+        # Keep at least three slots so SGDClassifier always runs one-vs-rest
+        # with one weight row per slot, even while only two labels are known.
+        self.capacity = max(initial_capacity, 3)
+
+    def encode_labels(self, labels):
+        codes = []
+        for label in labels:
+            code = self.label_codes.get(label)
+            if code is None:
+                code = len(self.labels)
+                self.labels.append(label)
+                self.label_codes[label] = code
+            codes.append(code)
+        return np.asarray(codes, dtype=np.int64)
+
+    def grow(self, capacity):
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        if hasattr(self.clf, 'classes_'):
+            for name in ('coef_', '_standard_coef', '_average_coef'):
+                weights = getattr(self.clf, name, None)
+                if weights is not None:
+                    setattr(self.clf, name, np.vstack([weights, np.zeros((extra, weights.shape[1]), dtype=weights.dtype)]))
+            for name in ('intercept_', '_standard_intercept', '_average_intercept'):
+                intercept = getattr(self.clf, name, None)
+                if isinstance(intercept, np.ndarray):
+                    setattr(self.clf, name, np.concatenate([intercept, np.zeros(extra, dtype=intercept.dtype)]))
+            self.clf.classes_ = np.arange(capacity)
+        self.capacity = capacity
+
+    def partial_fit(self, texts, labels):
+        y = self.encode_labels(labels)
+        if len(self.labels) > self.capacity:
+            self.grow(max(len(self.labels), 2 * self.capacity))
+        X = self.vectorizer.transform(texts)
+        if hasattr(self.clf, 'classes_'):
+            self.clf.partial_fit(X, y)
+        else:
+            self.clf.partial_fit(X, y, classes=np.arange(self.capacity))
+
+    def decision_function(self, texts):
+        # Unused slots only ever see negative examples, so they are dropped
+        # rather than allowed to compete.
+        return self.clf.decision_function(self.vectorizer.transform(texts))[:, :len(self.labels)]
+
+    def predict(self, texts):
+        scores = self.decision_function(texts)
+        return [self.labels[code] for code in scores.argmax(axis=1)]
+
+class InteractionHistory:
+    """
+    Append-only interaction history with a bounded in-memory window.
+
+    Recent records are held column-wise: texts in one list and labels as codes
+    in an integer array, with each distinct label string stored once. When a
+    MemoryStorage is attached, the oldest records are spilled to its
+    learning_history table in batches once the window is full. Without one,
+    those records are dropped instead: memory stays bounded, but retraining
+    only sees the most recent window (counted in dropped).
+    """
+
+    def __init__(self, storage=None, window=10000, spill_batch=1000):
+        self.storage = storage
+        self.window = window
+        self.spill_batch = spill_batch
+        self.texts = []
+        self.label_codes = array('i')
+        self.labels = []
+        self.label_index = {}
+        # Records already on disk from earlier sessions count as history too.
+        self.spilled = storage.count_learning_records() if storage is not None else 0
+        self.dropped = 0
+
+    def encode(self, label):
+        code = self.label_index.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(label)
+            self.label_index[label] = code
+        return code
+
+    def append(self, interaction):
+        self.texts.append(interaction['text'])
+        self.label_codes.append(self.encode(interaction['label']))
+        if len(self.texts) >= self.window + self.spill_batch:
+            if self.storage is not None:
+                self.spill(len(self.texts) - self.window)
+            else:
+                self.drop(len(self.texts) - self.window)
+
+    def spill(self, count):
+        records = [(self.texts[i], self.labels[self.label_codes[i]]) for i in range(count)]
+        if not self.storage.store_learning_records(records):
+            # Keep the records in memory; the next append retries the spill.
+            return
+        del self.texts[:count]
+        del self.label_codes[:count]
+        self.spilled += count
+
+    def drop(self, count):
+        del self.texts[:count]
+        del self.label_codes[:count]
+        self.dropped += count
+
+    def __len__(self):
+        return self.spilled + len(self.texts)
+
+    def iter_batches(self, batch_size=1000):
+        """
+        Yield the full history, oldest first, as (texts, label_codes) batches.
+
+        Spilled records are streamed from the database one page at a time, so
+        retraining never needs the whole history in memory at once.
+        """
+        if self.spilled and self.storage is not None:
+            for records in self.storage.iter_learning_records(batch_size):
+                yield ([text for text, _ in records],
+                       np.fromiter((self.encode(label) for _, label in records), dtype=np.int32, count=len(records)))
+        codes = np.frombuffer(self.label_codes, dtype=np.int32) if self.label_codes else np.zeros(0, dtype=np.int32)
+        for start in range(0, len(self.texts), batch_size):
+            yield self.texts[start:start + batch_size], codes[start:start + batch_size].copy()
+
+    def __iter__(self):
+        for texts, codes in self.iter_batches():
+            for text, code in zip(texts, codes):
+                yield {'text': text, 'label': self.labels[code]}
+
+    def recent(self, count):
+        start = max(len(self.texts) - count, 0)
+        return [{'text': self.texts[i], 'label': self.labels[self.label_codes[i]]} for i in range(start, len(self.texts))]
+
+# An immutable model generation. Training builds a new one off to the side and
+# publishes it by rebinding SelfModificationLearningModule.model, so readers
+# always see a complete, consistent model.
+TrainedModel = namedtuple('TrainedModel', ['version', 'vectorizer', 'label_encoder', 'clf', 'online_learner'])
+
 class SelfModificationLearningModule:
-    def __init__(self, vectorizer=None, label_encoder=None, chatgpt_api_key=None):
-        self.interaction_history = []
-        self.vectorizer = vectorizer if vectorizer else TfidfVectorizer()
-        self.label_encoder = label_encoder if label_encoder else LabelEncoder()
-        self.clf = SVC(kernel='linear')
+    def __init__(self, vectorizer=None, label_encoder=None, chatgpt_api_key=None, online=False,
+                 storage=None, history_window=10000, prediction_cache_size=1024):
+        self.interaction_history = InteractionHistory(storage, window=history_window)
+        self.prediction_cache = OrderedDict()
+        self.prediction_cache_size = prediction_cache_size
+        # The model generation the cache was filled from. Compared by identity,
+        # since a loaded snapshot can carry the same version number as the
+        # model it replaces.
+        self.prediction_cache_model = None
+        self.prediction_lock = threading.Lock()
+        # In online mode each interaction costs one partial_fit on a single
+        # sample instead of a refit over the whole history.
+        self.model = TrainedModel(
+            version=0,
+            vectorizer=vectorizer if vectorizer else TfidfVectorizer(),
+            label_encoder=label_encoder if label_encoder else LabelEncoder(),
+            clf=SVC(kernel='linear'),
+            online_learner=OnlineTextClassifier() if online else None
+        )
         self.chatgpt_api_key = chatgpt_api_key
 
+    @property
+    def vectorizer(self):
+        return self.model.vectorizer
+
+    @property
+    def label_encoder(self):
+        return self.model.label_encoder
+
+    @property
+    def clf(self):
+        return self.model.clf
+
+    @property
+    def online_learner(self):
+        return self.model.online_learner
+
     def learn_from_interaction(self, interaction):
+        self.record_interaction(interaction)
+        if self.online_learner is not None:
+            # Synchronous callers own the model, so the cheap in-place update is safe here.
+            self.online_learner.partial_fit([interaction['text']], [interaction['label']])
+            self.model = self.model._replace(version=self.model.version + 1)
+            return
+        self.retrain()
+
+    def record_interaction(self, interaction):
         self.interaction_history.append(interaction)
-        text_data = [interaction['text'] for interaction in self.interaction_history]
-        labels = [interaction['label'] for interaction in self.interaction_history]
-        X_train = self.vectorizer.fit_transform(text_data)
-        y_train = self.label_encoder.fit_transform(labels)
-        self.clf.fit(X_train, y_train)
+
+    def retrain(self, new_interactions=()):
+        """
+        Build the next model generation and publish it with one reference swap.
+
+        In refit mode the model is refitted on the full history; in online mode
+        a copy of the current learner is updated with new_interactions. The
+        current model is never mutated, so concurrent predictions are unaffected.
+
+        Returns:
+            int: Version of the published model.
+        """
+        current = self.model
+        if current.online_learner is not None:
+            learner = copy.deepcopy(current.online_learner)
+            if new_interactions:
+                learner.partial_fit([i['text'] for i in new_interactions], [i['label'] for i in new_interactions])
+            candidate = current._replace(version=current.version + 1, online_learner=learner)
+        else:
+            text_data, codes = [], []
+            for texts, batch_codes in self.interaction_history.iter_batches():
+                text_data.extend(texts)
+                codes.append(batch_codes)
+            labels = np.asarray(self.interaction_history.labels, dtype=object)[np.concatenate(codes)]
+            vectorizer = clone(current.vectorizer)
+            label_encoder = clone(current.label_encoder)
+            clf = clone(current.clf)
+            X_train = vectorizer.fit_transform(text_data)
+            y_train = label_encoder.fit_transform(labels)
+            clf.fit(X_train, y_train)
+            candidate = TrainedModel(current.version + 1, vectorizer, label_encoder, clf, None)
+        self.model = candidate
+        return candidate.version
+
+    def predict(self, texts):
+        """
+        Predict the most likely label for each text.
+
+        Returns:
+            list: One (label, score) tuple per text; (None, None) while no
+                model has been trained yet.
+        """
+        return [ranked[0] if ranked else (None, None) for ranked in self.predict_top_k(texts, k=1)]
+
+    def predict_top_k(self, texts, k=3):
+        """
+        Rank labels for a batch of texts with a single vectorize and decision_function call.
+
+        Recent results are cached per text and dropped whenever a different
+        model is published, by training or by load_snapshot.
+
+        Args:
+            texts (list): Texts to rank labels for.
+            k (int): Labels kept per text; None keeps every label.
+
+        Returns:
+            list: One list of up to k (label, score) tuples per text, best
+                first. The lists are empty until a model has been trained,
+                which is the normal state at startup while BackgroundTrainer
+                has not published its first version.
+        """
+        model = self.model
+        if not self.is_trained(model):
+            return [[] for _ in texts]
+        ranked = {}
+        with self.prediction_lock:
+            if self.prediction_cache_model is not model:
+                self.prediction_cache = OrderedDict()
+                self.prediction_cache_model = model
+            for text in texts:
+                if text in self.prediction_cache:
+                    self.prediction_cache.move_to_end(text)
+                    ranked[text] = self.prediction_cache[text]
+        missing = list(dict.fromkeys(text for text in texts if text not in ranked))
+        if missing:
+            labels, scores = self.score_batch(model, missing)
+            order = np.argsort(-scores, axis=1)
+            with self.prediction_lock:
+                for row, text in enumerate(missing):
+                    ranked[text] = [(labels[i], float(scores[row, i])) for i in order[row]]
+                    if self.prediction_cache_model is model and self.prediction_cache_size > 0:
+                        self.prediction_cache[text] = ranked[text]
+                        if len(self.prediction_cache) > self.prediction_cache_size:
+                            self.prediction_cache.popitem(last=False)
+        return [ranked[text][:k] for text in texts]
+
+    @staticmethod
+    def is_trained(model):
+        estimator = model.online_learner.clf if model.online_learner is not None else model.clf
+        try:
+            check_is_fitted(estimator)
+        except NotFittedError:
+            return False
+        return True
+
+    @staticmethod
+    def score_batch(model, texts):
+        if model.online_learner is not None:
+            return model.online_learner.labels, model.online_learner.decision_function(texts)
+        scores = model.clf.decision_function(model.vectorizer.transform(texts))
+        if scores.ndim == 1:
+            # Binary classifiers return one margin, positive for the second class.
+            scores = np.column_stack([-scores, scores])
+        labels = list(model.label_encoder.inverse_transform(model.clf.classes_))
+        return labels, scores
+
+    def save_snapshot(self, path):
+        save_model_snapshot(path, 'SelfModificationLearningModule', dict(self.model._asdict()))
+
+    def load_snapshot(self, path, mmap_mode='c'):
+        state = load_model_snapshot(path, 'SelfModificationLearningModule', mmap_mode)
+        self.model = TrainedModel(**state)
 
     def generate_code(self, task_context):
         template = "def {function_name}({parameters}): pass"
@@ -65,52 +414,999 @@ class SelfModificationLearningModule:
             logging.error(f"ChatGPT API error: {response.status_code} - {response.text}")
             return None
 
+class BackgroundTrainer:
+    """
+    Retrain a SelfModificationLearningModule off the request path.
+
+    Interactions are submitted to a queue and consumed by a worker thread,
+    which retrains once retrain_threshold interactions are pending or the
+    oldest one has waited retrain_interval seconds. New models are published
+    with SelfModificationLearningModule.retrain, so predictions keep using the
+    current model until the swap.
+    """
+
+    def __init__(self, module, retrain_threshold=100, retrain_interval=30.0):
+        self.module = module
+        self.retrain_threshold = retrain_threshold
+        self.retrain_interval = retrain_interval
+        self.queue = queue.Queue()
+        self.pending = []
+        self.oldest_pending_time = None
+        self.outstanding = 0
+        self.trained_interactions = 0
+        self.train_errors = 0
+        self.last_train_error = None
+        self.retry_at = None
+        self.last_train_duration = 0.0
+        self.last_trained_at = None
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.flush_requested = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='BackgroundTrainer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, interaction):
+        with self.lock:
+            self.outstanding += 1
+        self.queue.put((time.time(), interaction))
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                enqueued_at, interaction = self.queue.get(timeout=0.05)
+            except queue.Empty:
+                pass
+            else:
+                self.accept(enqueued_at, interaction)
+                while len(self.pending) < self.retrain_threshold:
+                    try:
+                        self.accept(*self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+            # After a failed retrain the batch stays pending and is retried
+            # once retrain_interval has passed, or at the next flush().
+            retry_due = self.retry_at is None or time.time() >= self.retry_at
+            if self.pending and retry_due and (self.flush_requested.is_set()
+                                               or len(self.pending) >= self.retrain_threshold
+                                               or time.time() - self.oldest_pending_time >= self.retrain_interval):
+                self.train()
+            with self.lock:
+                if self.outstanding == 0:
+                    self.flush_requested.clear()
+
+    def accept(self, enqueued_at, interaction):
+        self.module.record_interaction(interaction)
+        with self.lock:
+            if not self.pending:
+                self.oldest_pending_time = enqueued_at
+            self.pending.append(interaction)
+
+    def train(self):
+        with self.lock:
+            batch, oldest, self.pending = self.pending, self.oldest_pending_time, []
+        start = time.time()
+        try:
+            self.module.retrain(batch)
+        except Exception as e:
+            logging.error(f"Background retraining failed: {e}")
+            with self.lock:
+                # Put the batch back ahead of anything accepted meanwhile.
+                self.pending[:0] = batch
+                self.oldest_pending_time = oldest
+                self.train_errors += 1
+                self.last_train_error = str(e)
+                self.retry_at = time.time() + self.retrain_interval
+                self.flush_requested.clear()
+                self.idle.notify_all()
+            return
+        with self.lock:
+            self.last_train_duration = time.time() - start
+            self.last_trained_at = time.time()
+            self.trained_interactions += len(batch)
+            self.outstanding -= len(batch)
+            self.oldest_pending_time = None if not self.pending else self.oldest_pending_time
+            self.retry_at = None
+            self.idle.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Train on everything submitted so far and wait for the model to be published.
+
+        Returns:
+            bool: True if all submitted interactions were trained on before the
+                timeout; False on timeout or if a retrain attempt failed.
+        """
+        with self.idle:
+            errors = self.train_errors
+            self.retry_at = None
+            self.flush_requested.set()
+            self.idle.wait_for(lambda: self.outstanding == 0 or self.train_errors != errors, timeout)
+            return self.outstanding == 0
+
+    def stop(self, drain=True):
+        if drain and self.thread.is_alive():
+            self.flush()
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def metrics(self):
+        with self.lock:
+            lag = time.time() - self.oldest_pending_time if self.oldest_pending_time is not None else 0.0
+            return {
+                'model_version': self.module.model.version,
+                'queued': self.queue.qsize(),
+                'pending': len(self.pending),
+                'training_lag_seconds': lag,
+                'last_train_duration_seconds': self.last_train_duration,
+                'last_trained_at': self.last_trained_at,
+                'trained_interactions': self.trained_interactions,
+                'train_errors': self.train_errors,
+                'last_train_error': self.last_train_error
+            }
+
 class Adaptability:
-    def __init__(self, vectorizer=None, label_encoder=None):
-        self.feedback_history = []
-        self.sgd_clf = SGDClassifier()
-        self.vectorizer = vectorizer if vectorizer else TfidfVectorizer()
-        self.label_encoder = label_encoder if label_encoder else LabelEncoder()
+    def __init__(self, vectorizer=None, batch_size=32, replay_size=1000, replay_ratio=1.0, random_state=None):
+        # Feedback is queued into mini-batches; each full batch is mixed with a
+        # sample of older feedback from a bounded replay buffer to limit
+        # forgetting, so cost and memory per event stay flat.
+        self.learner = OnlineTextClassifier(vectorizer=vectorizer)
+        self.batch_size = batch_size
+        self.replay_size = replay_size
+        self.replay_ratio = replay_ratio
+        self.pending_feedback = []
+        self.replay_buffer = []
+        self.feedback_seen = 0
+        self.rng = random.Random(random_state)
+
+    @property
+    def sgd_clf(self):
+        return self.learner.clf
+
+    @property
+    def vectorizer(self):
+        return self.learner.vectorizer
 
     def adapt(self, feedback):
-        self.feedback_history.append(feedback)
-        feedback_data = [feedback['text'] for feedback in self.feedback_history]
-        labels = [feedback['label'] for feedback in self.feedback_history]
-        X_train = self.vectorizer.transform(feedback_data)
-        y_train = self.label_encoder.transform(labels)
-        self.sgd_clf.fit(X_train, y_train)
+        self.pending_feedback.append((feedback['text'], feedback['label']))
+        if len(self.pending_feedback) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending_feedback:
+            return
+        batch, self.pending_feedback = self.pending_feedback, []
+        n_replay = min(len(self.replay_buffer), int(len(batch) * self.replay_ratio))
+        examples = batch + self.rng.sample(self.replay_buffer, n_replay)
+        self.learner.partial_fit([text for text, _ in examples], [label for _, label in examples])
+        for item in batch:
+            self.remember(item)
+
+    def save_snapshot(self, path):
+        save_model_snapshot(path, 'Adaptability', {'learner': self.learner})
+
+    def load_snapshot(self, path, mmap_mode='c'):
+        self.learner = load_model_snapshot(path, 'Adaptability', mmap_mode)['learner']
+
+    def remember(self, item):
+        # Reservoir sampling keeps every feedback event seen so far in the
+        # buffer with equal probability replay_size / feedback_seen.
+        self.feedback_seen += 1
+        if len(self.replay_buffer) < self.replay_size:
+            self.replay_buffer.append(item)
+            return
+        slot = self.rng.randrange(self.feedback_seen)
+        if slot < self.replay_size:
+            self.replay_buffer[slot] = item
+
+class LRUCache:
+    """
+    Small least-recently-used mapping with hit and miss counters.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'max_size': self.max_size}
+
+# Operations a SolverExecutor worker runs by name. Jobs may also name any
+# picklable module-level callable directly.
+SOLVER_OPERATIONS = {
+    'solve': sp.solve,
+    'diff': sp.diff,
+    'integrate': sp.integrate
+}
+
+def solver_worker(connection):
+    """
+    Worker process loop for SolverExecutor: announce readiness, then run
+    (operation, args) jobs received on connection until it is closed.
+    """
+    connection.send('ready')
+    while True:
+        try:
+            operation, args = connection.recv()
+        except EOFError:
+            break
+        try:
+            function = SOLVER_OPERATIONS[operation] if isinstance(operation, str) else operation
+            outcome = ('ok', function(*args))
+        except Exception as e:
+            outcome = ('error', f"{type(e).__name__}: {e}")
+        try:
+            connection.send(outcome)
+        except Exception as e:
+            connection.send(('error', f"Unpicklable result: {e}"))
+
+class SolverJob:
+    def __init__(self, operation, args, timeout):
+        self.operation = operation
+        self.args = args
+        self.timeout = timeout
+        self.future = Future()
+
+class SolverExecutor:
+    """
+    Run symbolic jobs in a pool of worker processes with per-job timeouts.
+
+    Each worker process is driven by a dispatcher thread that sends it one
+    job at a time over a pipe. When a job exceeds its timeout, is cancelled
+    while running, or its worker dies, the worker is killed and replaced, so
+    one pathological sp.solve or sp.integrate never stalls the other jobs.
+
+    submit() returns a concurrent.futures.Future. Jobs stay cancellable with
+    Future.cancel() until they finish, including while they are running.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, max_workers=None, timeout=30.0, mp_context=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        if mp_context is None:
+            # Forking a process that runs dispatcher threads is unsafe; the
+            # fork server forks workers from a clean single-threaded process.
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self.mp_context = mp_context
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'timed_out': 0,
+                         'cancelled': 0, 'worker_restarts': 0}
+        self.busy = 0
+        self.closed = False
+        self.threads = [threading.Thread(target=self.dispatch, name=f'SolverExecutor-{i}', daemon=True)
+                        for i in range(self.max_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancel_futures=exc_type is not None)
+
+    def submit(self, operation, *args, timeout=None):
+        """
+        Queue a job.
+
+        Args:
+            operation (str or callable): A SOLVER_OPERATIONS name ('solve',
+                'diff', 'integrate') or a picklable module-level callable.
+            *args: Arguments for the operation; they must be picklable.
+            timeout (float): Seconds the job may run once started. Defaults to
+                the executor timeout; None disables the limit.
+
+        Returns:
+            Future: Resolves to the result, or raises TimeoutError or
+                RuntimeError if the job timed out or failed in the worker.
+        """
+        if self.closed:
+            raise RuntimeError("Cannot submit to a SolverExecutor after shutdown")
+        job = SolverJob(operation, args, self.timeout if timeout is None else timeout)
+        with self.lock:
+            self.counters['submitted'] += 1
+        self.jobs.put(job)
+        return job.future
+
+    def map_unordered(self, operation, argument_tuples, timeout=None):
+        """
+        Fan out one operation over many argument tuples.
+
+        Yields:
+            tuple: (index, result) in completion order. Jobs that fail or time
+                out are logged and yield None as their result.
+        """
+        futures = {self.submit(operation, *args, timeout=timeout): index
+                   for index, args in enumerate(argument_tuples)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result()
+            except (Exception, CancelledError) as e:
+                logging.error(f"Solver job {index} failed: {e}")
+                yield index, None
+
+    def start_worker(self):
+        parent_connection, child_connection = self.mp_context.Pipe()
+        process = self.mp_context.Process(target=solver_worker, args=(child_connection,), daemon=True)
+        process.start()
+        child_connection.close()
+        # Wait for the worker to finish importing before timing any job on it.
+        parent_connection.recv()
+        return process, parent_connection
+
+    def stop_worker(self, process, connection, kill=False):
+        if kill:
+            process.kill()
+        connection.close()
+        process.join()
+
+    def dispatch(self):
+        process, connection = self.start_worker()
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            # The future stays PENDING while the job runs so that
+            # Future.cancel() can still interrupt it.
+            if job.future.cancelled():
+                job.future.set_running_or_notify_cancel()
+                self.count('cancelled')
+                continue
+            with self.lock:
+                self.busy += 1
+            status, value = self.run_job(job, process, connection)
+            with self.lock:
+                self.busy -= 1
+            if status in ('timed_out', 'cancelled', 'crashed'):
+                self.stop_worker(process, connection, kill=True)
+                self.count('worker_restarts')
+                process, connection = self.start_worker()
+            if status == 'ok':
+                self.count('completed')
+                self.resolve(job, result=value)
+            elif status == 'cancelled':
+                job.future.set_running_or_notify_cancel()
+                self.count('cancelled')
+            elif status == 'timed_out':
+                self.count('timed_out')
+                self.resolve(job, error=TimeoutError(f"Solver job exceeded {job.timeout} seconds"))
+            else:
+                self.count('failed')
+                self.resolve(job, error=RuntimeError(value))
+        self.stop_worker(process, connection)
+
+    def run_job(self, job, process, connection):
+        try:
+            connection.send((job.operation, job.args))
+        except Exception as e:
+            if process.exitcode is not None:
+                return 'crashed', f"Solver worker exited with code {process.exitcode}"
+            return 'error', f"Could not send job to worker: {e}"
+        deadline = time.monotonic() + job.timeout if job.timeout else None
+        while True:
+            wait = self.POLL_INTERVAL if deadline is None else min(self.POLL_INTERVAL, max(deadline - time.monotonic(), 0))
+            if connection_wait([connection, process.sentinel], wait):
+                try:
+                    return connection.recv()
+                except (EOFError, OSError):
+                    return 'crashed', f"Solver worker exited with code {process.exitcode}"
+            if job.future.cancelled():
+                return 'cancelled', None
+            if deadline is not None and time.monotonic() >= deadline:
+                return 'timed_out', None
+
+    def resolve(self, job, result=None, error=None):
+        # A cancel() that races with completion wins; the result is dropped.
+        if job.future.cancelled():
+            job.future.set_running_or_notify_cancel()
+            return
+        try:
+            if error is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(error)
+        except InvalidStateError:
+            job.future.set_running_or_notify_cancel()
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def metrics(self):
+        with self.lock:
+            return dict(self.counters, queued=self.jobs.qsize(), busy=self.busy, workers=self.max_workers)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Stop accepting jobs and stop the workers once queued jobs are done.
+
+        Args:
+            wait (bool): Block until the dispatcher threads and workers have exited.
+            cancel_futures (bool): Cancel jobs that have not started yet.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if cancel_futures:
+            while True:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                job.future.cancel()
+                job.future.set_running_or_notify_cancel()
+                self.count('cancelled')
+        for _ in self.threads:
+            self.jobs.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+def iter_data_chunks(source, chunksize=100000, columns=None):
+    """
+    Yield a dataset as pandas DataFrame chunks without loading it whole.
+
+    Args:
+        source: A CSV or Parquet (.parquet, .pq) path, a DataFrame, or an
+            iterable of DataFrames.
+        chunksize (int): Rows per chunk read from a file.
+        columns (list): Columns to read. Defaults to all.
+    """
+    if isinstance(source, pd.DataFrame):
+        yield source if columns is None else source[columns]
+    elif isinstance(source, (str, os.PathLike)):
+        if str(source).lower().endswith(('.parquet', '.pq')):
+            # pyarrow is only needed for Parquet input.
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(source, chunksize=chunksize, usecols=columns)
+    else:
+        for chunk in source:
+            yield chunk if columns is None else chunk[columns]
+
+class StreamingStatistics:
+    """
+    One-pass, mergeable summary statistics and correlations for numeric columns.
+
+    For every pair of columns (i, j) the statistics of the rows where both are
+    present are kept: the count, the means and sums of squared deviations of
+    each column, and the co-moment. Chunks are reduced with matrix products and
+    folded in with Chan et al.'s pairwise update, the parallel form of
+    Welford's algorithm, so results match pandas' pairwise-complete describe()
+    and corr() without accumulating raw sums. The diagonal holds each column's
+    own count, mean and variance. Quantiles come from a per-column reservoir
+    sample and are exact while a column has at most reservoir_size values.
+
+    Partial statistics computed over disjoint parts of a dataset, for example
+    in separate processes, combine with merge().
+    """
+
+    QUANTILES = (0.25, 0.5, 0.75)
+
+    def __init__(self, reservoir_size=10000, random_state=None):
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(random_state)
+        self.columns = []
+        self.counts = np.zeros((0, 0))
+        self.means = np.zeros((0, 0))
+        self.squares = np.zeros((0, 0))
+        self.comoments = np.zeros((0, 0))
+        self.minimums = np.zeros(0)
+        self.maximums = np.zeros(0)
+        self.reservoirs = []
+
+    def add_columns(self, columns):
+        new_columns = [column for column in columns if column not in self.columns]
+        if not new_columns:
+            return
+        old, size = len(self.columns), len(self.columns) + len(new_columns)
+        for name in ('counts', 'means', 'squares', 'comoments'):
+            grown = np.zeros((size, size))
+            grown[:old, :old] = getattr(self, name)
+            setattr(self, name, grown)
+        self.minimums = np.concatenate([self.minimums, np.full(len(new_columns), np.inf)])
+        self.maximums = np.concatenate([self.maximums, np.full(len(new_columns), -np.inf)])
+        self.reservoirs.extend((0, np.empty(0)) for _ in new_columns)
+        self.columns.extend(new_columns)
+
+    def update(self, chunk):
+        """Fold the numeric columns of a DataFrame chunk into the statistics."""
+        numeric = chunk.select_dtypes(include='number')
+        if numeric.empty:
+            return self
+        partial = StreamingStatistics(self.reservoir_size, self.rng.integers(2 ** 32))
+        partial.add_columns(list(numeric.columns))
+        values = numeric.to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        mask = present.astype(float)
+        counts = mask.T @ mask
+        # Shift by the chunk's column means before taking products so the
+        # sums of squares do not cancel catastrophically.
+        offsets = np.where(present, values, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        shifted = np.where(present, values - offsets, 0.0)
+        sums = shifted.T @ mask
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, 0.0)
+            partial.means = np.where(counts > 0, means + offsets[:, None], 0.0)
+            partial.squares = np.where(counts > 0, (shifted ** 2).T @ mask - sums * means, 0.0)
+            partial.comoments = np.where(counts > 0, shifted.T @ shifted - sums * means.T, 0.0)
+        partial.counts = counts
+        partial.minimums = np.where(present, values, np.inf).min(axis=0)
+        partial.maximums = np.where(present, values, -np.inf).max(axis=0)
+        partial.reservoirs = [partial.sample(values[present[:, i], i]) for i in range(values.shape[1])]
+        return self.merge(partial)
+
+    def sample(self, values):
+        if len(values) <= self.reservoir_size:
+            return len(values), values.copy()
+        return len(values), self.rng.choice(values, self.reservoir_size, replace=False)
+
+    def merge_reservoirs(self, left, right):
+        (left_seen, left_sample), (right_seen, right_sample) = left, right
+        seen = left_seen + right_seen
+        if len(left_sample) + len(right_sample) <= self.reservoir_size:
+            return seen, np.concatenate([left_sample, right_sample])
+        # Draw each slot from either side in proportion to the values it has seen.
+        from_left = self.rng.binomial(self.reservoir_size, left_seen / seen)
+        from_left = int(np.clip(from_left, self.reservoir_size - len(right_sample), len(left_sample)))
+        return seen, np.concatenate([
+            self.rng.choice(left_sample, from_left, replace=False),
+            self.rng.choice(right_sample, self.reservoir_size - from_left, replace=False)
+        ])
+
+    def merge(self, other):
+        """
+        Combine statistics over a disjoint part of the data into this object.
+
+        Returns:
+            StreamingStatistics: self, updated in place.
+        """
+        self.add_columns(other.columns)
+        index = np.array([self.columns.index(column) for column in other.columns], dtype=int)
+        block = np.ix_(index, index)
+        n_a, n_b = self.counts[block], other.counts
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, n_a * n_b / n, 0.0)
+            delta = other.means - self.means[block]
+            self.means[block] = np.where(n > 0, self.means[block] + delta * np.where(n > 0, n_b / n, 0.0), 0.0)
+        self.squares[block] = self.squares[block] + other.squares + delta ** 2 * weight
+        self.comoments[block] = self.comoments[block] + other.comoments + delta * delta.T * weight
+        self.counts[block] = n
+        self.minimums[index] = np.minimum(self.minimums[index], other.minimums)
+        self.maximums[index] = np.maximum(self.maximums[index], other.maximums)
+        for position, column in zip(index, other.reservoirs):
+            self.reservoirs[position] = self.merge_reservoirs(self.reservoirs[position], column)
+        return self
+
+    def summary_statistics(self):
+        counts = np.diag(self.counts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.diag(self.squares) / (counts - 1))
+        std[counts < 2] = np.nan
+        empty = counts == 0
+        rows = {
+            'count': counts,
+            'mean': np.where(empty, np.nan, np.diag(self.means)),
+            'std': std,
+            'min': np.where(empty, np.nan, self.minimums)
+        }
+        for q in self.QUANTILES:
+            rows[f'{q:.0%}'] = [np.quantile(sample, q) if len(sample) else np.nan for _, sample in self.reservoirs]
+        rows['max'] = np.where(empty, np.nan, self.maximums)
+        return pd.DataFrame(rows, index=self.columns).T
+
+    def correlation_matrix(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = self.comoments / np.sqrt(self.squares * self.squares.T)
+        return pd.DataFrame(np.clip(correlation, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+    def result(self):
+        return {
+            'summary_statistics': self.summary_statistics(),
+            'correlation_matrix': self.correlation_matrix()
+        }
 
 class ProblemSolving:
+    def __init__(self, cache_size=256, max_cached_expression_length=4000, executor=None, timeout=None):
+        # Parsed expressions are cached by their input string; symbolic results
+        # and compiled functions by the canonical srepr of the parsed
+        # expression, so "x**2-4" and "x**2 - 4" share one entry. Expressions
+        # whose canonical form exceeds max_cached_expression_length are never cached.
+        self.parse_cache = LRUCache(cache_size)
+        self.result_cache = LRUCache(cache_size)
+        self.compiled_cache = LRUCache(cache_size)
+        self.max_cached_expression_length = max_cached_expression_length
+        # With a SolverExecutor, sp.solve and sp.integrate run in its worker
+        # processes and are abandoned after timeout seconds (None uses the
+        # executor's default) instead of blocking this process.
+        self.executor = executor
+        self.timeout = timeout
+
+    def parse(self, expression_str):
+        if not isinstance(expression_str, str):
+            return sp.sympify(expression_str)
+        expression = self.parse_cache.get(expression_str)
+        if expression is None:
+            expression = sp.sympify(expression_str)
+            if len(expression_str) <= self.max_cached_expression_length:
+                self.parse_cache.put(expression_str, expression)
+        return expression
+
+    def result_key(self, operation, expression):
+        canonical = sp.srepr(expression)
+        if len(canonical) > self.max_cached_expression_length:
+            return None
+        return (operation, canonical)
+
+    def cached_operation(self, operation, expression_str, compute):
+        expression = self.parse(expression_str)
+        key = self.result_key(operation, expression)
+        if key is None:
+            return compute(expression)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = compute(expression)
+            self.result_cache.put(key, result)
+        # sp.solve returns a mutable list; hand out copies so callers cannot
+        # modify the cached entry.
+        return list(result) if isinstance(result, list) else result
+
+    def run_operation(self, operation, *args):
+        if self.executor is None:
+            return SOLVER_OPERATIONS[operation](*args)
+        return self.executor.submit(operation, *args, timeout=self.timeout).result()
+
+    def run_many(self, operation, argument_tuples):
+        if self.executor is not None:
+            yield from self.executor.map_unordered(operation, argument_tuples, timeout=self.timeout)
+            return
+        for index, args in enumerate(argument_tuples):
+            try:
+                yield index, SOLVER_OPERATIONS[operation](*args)
+            except Exception as e:
+                logging.error(f"Solver job {index} failed: {e}")
+                yield index, None
+
+    def cache_info(self):
+        return {
+            'parse': self.parse_cache.info(),
+            'results': self.result_cache.info(),
+            'compiled': self.compiled_cache.info()
+        }
+
     def solve_equation(self, equation_str):
-        equation = sp.sympify(equation_str)
-        solution = sp.solve(equation)
-        return solution
+        return self.cached_operation('solve', equation_str, lambda e: self.run_operation('solve', e))
 
     def find_derivative(self, expression_str):
-        expression = sp.sympify(expression_str)
-        derivative = sp.diff(expression)
-        return derivative
+        return self.cached_operation('diff', expression_str, sp.diff)
 
     def integrate_expression(self, expression_str):
-        expression = sp.sympify(expression_str)
-        integral = sp.integrate(expression)
-        return integral
+        return self.cached_operation('integrate', expression_str, lambda e: self.run_operation('integrate', e))
+
+    def solve_many(self, expressions, operation='solve'):
+        """
+        Run one operation over independent expressions, fanning cache misses
+        out across the executor's workers.
+
+        Args:
+            expressions (list): Expression strings.
+            operation (str): 'solve', 'diff' or 'integrate'.
+
+        Yields:
+            tuple: (index, result), cache hits first and the rest in completion
+                order. Expressions that fail or time out are logged and yield None.
+        """
+        misses = []
+        for index, expression_str in enumerate(expressions):
+            try:
+                expression = self.parse(expression_str)
+            except (sp.SympifyError, TypeError) as e:
+                logging.error(f"Could not parse expression {index}: {e}")
+                yield index, None
+                continue
+            key = self.result_key(operation, expression)
+            result = self.result_cache.get(key) if key is not None else None
+            if result is not None:
+                yield index, list(result) if isinstance(result, list) else result
+            else:
+                misses.append((index, key, expression))
+        for position, result in self.run_many(operation, [(expression,) for _, _, expression in misses]):
+            index, key, _ = misses[position]
+            if result is not None and key is not None:
+                self.result_cache.put(key, result)
+            yield index, list(result) if isinstance(result, list) else result
+
+    def compile(self, expression_str, variables=None):
+        """
+        Compile an expression into a NumPy function with lambdify.
+
+        Args:
+            expression_str (str): Expression to compile.
+            variables (list): Argument order as symbol names. Defaults to the
+                expression's free symbols sorted by name.
+
+        Returns:
+            callable: Function of the variables, also accepting NumPy arrays.
+                Its argument symbols are available as the `symbols` attribute.
+        """
+        expression = self.parse(expression_str)
+        if variables is None:
+            symbols = tuple(sorted(expression.free_symbols, key=lambda symbol: symbol.name))
+        else:
+            symbols = tuple(sp.Symbol(v) if isinstance(v, str) else v for v in variables)
+        canonical = sp.srepr(expression)
+        key = (canonical, tuple(symbol.name for symbol in symbols))
+        function = self.compiled_cache.get(key)
+        if function is None:
+            function = sp.lambdify(symbols, expression, 'numpy')
+            function.symbols = symbols
+            if len(canonical) <= self.max_cached_expression_length:
+                self.compiled_cache.put(key, function)
+        return function
 
     def solve_system_of_equations(self, equations, variables):
-        equations = [sp.Eq(sp.sympify(equation), 0) for equation in equations]
-        solutions = sp.solve(equations, variables)
+        equations = [sp.Eq(self.parse(equation), 0) for equation in equations]
+        solutions = self.run_operation('solve', equations, variables)
         return solutions
 
+    def solve_systems(self, systems):
+        """
+        Solve independent systems of equations, in parallel with an executor.
+
+        Args:
+            systems (list): (equations, variables) pairs as accepted by solve_system_of_equations.
+
+        Yields:
+            tuple: (index, solutions) in completion order; failed or timed-out
+                systems are logged and yield None.
+        """
+        argument_tuples = [([sp.Eq(self.parse(equation), 0) for equation in equations], variables)
+                           for equations, variables in systems]
+        yield from self.run_many('solve', argument_tuples)
+
+    # scipy.optimize.minimize methods that make use of an exact Hessian.
+    HESSIAN_METHODS = ('Newton-CG', 'dogleg', 'trust-ncg', 'trust-krylov', 'trust-exact', 'trust-constr')
+
     def minimize_function(self, func, initial_guess):
         result = minimize(func, initial_guess)
         return result
 
-    def analyze_data(self, data):
-        analysis_results = {
-            'summary_statistics': data.describe(),
-            'correlation_matrix': data.corr()
+    def expression_symbols(self, expression, variables=None):
+        if variables is None:
+            return tuple(sorted(expression.free_symbols, key=lambda symbol: symbol.name))
+        return tuple(sp.Symbol(v) if isinstance(v, str) else v for v in variables)
+
+    def compile_derivatives(self, expression_str, variables=None):
+        """
+        Derive the gradient and Hessian symbolically and compile both with lambdify.
+
+        Returns:
+            tuple: (gradient, hessian) functions of the variables, returning NumPy arrays.
+        """
+        expression = self.parse(expression_str)
+        symbols = self.expression_symbols(expression, variables)
+        canonical = sp.srepr(expression)
+        key = ('derivatives', canonical, tuple(symbol.name for symbol in symbols))
+        derivatives = self.compiled_cache.get(key)
+        if derivatives is None:
+            gradient = [sp.diff(expression, symbol) for symbol in symbols]
+            hessian = sp.hessian(expression, symbols)
+            gradient_f = sp.lambdify(symbols, gradient, 'numpy')
+            hessian_f = sp.lambdify(symbols, hessian, 'numpy')
+            derivatives = (lambda *x: np.asarray(gradient_f(*x), dtype=float),
+                           lambda *x: np.asarray(hessian_f(*x), dtype=float))
+            if len(canonical) <= self.max_cached_expression_length:
+                self.compiled_cache.put(key, derivatives)
+        return derivatives
+
+    def minimize_expression(self, expression_str, initial_guess, variables=None, method='trust-exact', **options):
+        """
+        Minimize an expression using its exact, compiled gradient and Hessian.
+
+        Args:
+            expression_str (str): Objective as an expression.
+            initial_guess (array-like): Starting point, ordered like variables.
+            variables (list): Variable order. Defaults to free symbols sorted by name.
+            method (str): Any scipy.optimize.minimize method; the Hessian is
+                passed only to methods that use it.
+            **options: Passed through to scipy.optimize.minimize.
+
+        Returns:
+            OptimizeResult: The scipy optimization result.
+        """
+        expression = self.parse(expression_str)
+        symbols = self.expression_symbols(expression, variables)
+        objective = self.compile(expression, variables=symbols)
+        gradient, hessian = self.compile_derivatives(expression, variables=symbols)
+        kwargs = dict(options)
+        if method in self.HESSIAN_METHODS:
+            kwargs['hess'] = lambda x: hessian(*x)
+        return minimize(lambda x: float(objective(*x)), np.asarray(initial_guess, dtype=float),
+                        jac=lambda x: gradient(*x), method=method, **kwargs)
+
+    def evaluate(self, expression_str, values, variables=None):
+        """
+        Evaluate an expression over NumPy arrays in one vectorized call.
+
+        Args:
+            expression_str (str): Expression to evaluate.
+            values (dict): Symbol name to scalar or array; arrays broadcast together.
+            variables (list): Variable order. Defaults to the keys of values sorted by name.
+
+        Returns:
+            numpy.ndarray: The expression evaluated at every broadcast point.
+        """
+        names = list(variables) if variables is not None else sorted(values)
+        function = self.compile(expression_str, variables=names)
+        arrays = np.broadcast_arrays(*[np.asarray(values[name], dtype=float) for name in names])
+        # Constant expressions come back as scalars; broadcast them to the input shape.
+        return np.broadcast_to(np.asarray(function(*arrays), dtype=float), arrays[0].shape if arrays else ())
+
+    def evaluate_grid(self, expression_str, axes):
+        """
+        Evaluate an expression on the Cartesian grid spanned by 1-D axes.
+
+        Args:
+            expression_str (str): Expression to evaluate.
+            axes (dict): Symbol name to a 1-D array of sample points.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(axis) for each name, sorted by name).
+        """
+        names = sorted(axes)
+        grids = np.meshgrid(*[np.asarray(axes[name], dtype=float) for name in names], indexing='ij')
+        return self.evaluate(expression_str, dict(zip(names, grids)), variables=names)
+
+    def analyze_data(self, data, chunksize=None, columns=None, reservoir_size=10000):
+        """
+        Summarize a dataset and correlate its numeric columns.
+
+        An in-memory DataFrame is analyzed directly with pandas unless a
+        chunksize is given. Anything else (a CSV or Parquet path, or an
+        iterable of DataFrames) is streamed chunk by chunk through
+        StreamingStatistics, so memory stays bounded by the chunk size.
+
+        Args:
+            data: DataFrame, file path or iterable of DataFrames.
+            chunksize (int): Rows per chunk when streaming. Defaults to 100000.
+            columns (list): Columns to read when streaming.
+            reservoir_size (int): Values kept per column for quantile estimates.
+
+        Returns:
+            dict: 'summary_statistics' in the layout of DataFrame.describe()
+                and 'correlation_matrix' in the layout of DataFrame.corr().
+        """
+        if isinstance(data, pd.DataFrame) and chunksize is None:
+            analysis_results = {
+                'summary_statistics': data.describe(),
+                'correlation_matrix': data.corr()
+            }
+            return analysis_results
+        return self.stream_statistics(data, chunksize, columns, reservoir_size).result()
+
+    def stream_statistics(self, data, chunksize=None, columns=None, reservoir_size=10000):
+        """
+        Stream a dataset into a StreamingStatistics.
+
+        Partial statistics over separate files or row ranges can be computed
+        independently and combined with StreamingStatistics.merge().
+        """
+        statistics = StreamingStatistics(reservoir_size=reservoir_size)
+        for chunk in iter_data_chunks(data, chunksize or 100000, columns):
+            statistics.update(chunk)
+        return statistics
+
+def benchmark_learning_modes(train_interactions, test_interactions):
+    """
+    Compare the refit-on-every-interaction path with the online learner.
+
+    Args:
+        train_interactions (list): Interactions fed one at a time to learn_from_interaction.
+        test_interactions (list): Held-out interactions used to measure accuracy.
+
+    Returns:
+        dict: Per mode, the mean and final per-interaction latency in seconds and the held-out accuracy.
+    """
+    texts = [interaction['text'] for interaction in test_interactions]
+    expected = [interaction['label'] for interaction in test_interactions]
+    results = {}
+    for mode, online in (('refit', False), ('online', True)):
+        module = SelfModificationLearningModule(online=online)
+        latencies = []
+        for interaction in train_interactions:
+            start = time.perf_counter()
+            try:
+                module.learn_from_interaction(interaction)
+            except ValueError:
+                # SVC cannot be fitted until at least two labels have been seen.
+                pass
+            latencies.append(time.perf_counter() - start)
+        predicted = [label for label, _ in module.predict(texts)]
+        results[mode] = {
+            'mean_latency_seconds': float(np.mean(latencies)),
+            'final_latency_seconds': float(np.mean(latencies[-10:])),
+            'accuracy': float(np.mean([p == e for p, e in zip(predicted, expected)]))
         }
-        return analysis_results
+    return results
+
+def rosenbrock_expression(dimensions):
+    variables = [f'x{i}' for i in range(dimensions)]
+    terms = [f'100*({variables[i + 1]} - {variables[i]}**2)**2 + (1 - {variables[i]})**2'
+             for i in range(dimensions - 1)]
+    return ' + '.join(terms), variables
+
+def benchmark_minimization(dimensions=(2, 5, 10)):
+    """
+    Compare finite-difference minimization of Python callables with
+    minimize_expression on standard test functions.
+
+    The one-off cost of deriving and compiling the gradient and Hessian is
+    reported separately as compile_seconds, since it is cached across solves.
+
+    Returns:
+        list: One dict per problem with time, function evaluations and final value for each path.
+    """
+    solver = ProblemSolving()
+    problems = [(f'rosenbrock-{n}d',) + rosenbrock_expression(n) + (np.full(n, -1.2),) for n in dimensions]
+    problems.append(('beale', '(1.5 - x + x*y)**2 + (2.25 - x + x*y**2)**2 + (2.625 - x + x*y**3)**2',
+                     ['x', 'y'], np.array([1.0, 1.0])))
+    results = []
+    for name, expression, variables, x0 in problems:
+        python_function = solver.compile(expression, variables=variables)
+        start = time.perf_counter()
+        opaque = solver.minimize_function(lambda x: float(python_function(*x)), x0)
+        opaque_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        solver.compile_derivatives(expression, variables=variables)
+        compile_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        symbolic = solver.minimize_expression(expression, x0, variables=variables)
+        symbolic_seconds = time.perf_counter() - start
+        results.append({
+            'problem': name,
+            'finite_difference': {'seconds': opaque_seconds, 'nfev': int(opaque.nfev), 'fun': float(opaque.fun)},
+            'symbolic': {'seconds': symbolic_seconds, 'compile_seconds': compile_seconds,
+                         'nfev': int(symbolic.nfev), 'fun': float(symbolic.fun)}
+        })
+    return results
 
 class TestSelfModificationLearning(unittest.TestCase):
     def test_learn_from_interaction(self):
@@ -119,6 +1415,303 @@ class TestSelfModificationLearning(unittest.TestCase):
         module.learn_from_interaction(interaction)
         self.assertTrue(module.clf.support_vectors_.any())
 
+    def test_online_learning_handles_new_labels(self):
+        module = SelfModificationLearningModule(online=True)
+        examples = [
+            ('book a table for two', 'booking'),
+            ('what is the weather today', 'weather'),
+            ('reserve a room for friday', 'booking'),
+            ('will it rain tomorrow', 'weather'),
+        ]
+        for _ in range(5):
+            for text, label in examples:
+                module.learn_from_interaction({'text': text, 'label': label})
+        self.assertEqual(module.online_learner.predict(['book a table']), ['booking'])
+        for _ in range(5):
+            for text in ('delete the old files', 'list files in the folder', 'remove this file'):
+                module.learn_from_interaction({'text': text, 'label': 'file_operation'})
+        self.assertEqual(module.online_learner.labels, ['booking', 'weather', 'file_operation'])
+        self.assertEqual(module.online_learner.predict(['list the files', 'will it rain']), ['file_operation', 'weather'])
+
+    def test_online_learner_grows_past_initial_capacity(self):
+        learner = OnlineTextClassifier(initial_capacity=3)
+        for i in range(5):
+            learner.partial_fit([f'topic{i} words'], [f'label{i}'])
+        self.assertEqual(learner.clf.coef_.shape[0], learner.capacity)
+        self.assertGreaterEqual(learner.capacity, 5)
+        self.assertEqual(learner.decision_function(['topic4 words']).shape, (1, 5))
+
+    def test_benchmark_learning_modes(self):
+        interactions = [{'text': f'please book slot {i}', 'label': 'booking'} if i % 2 else
+                        {'text': f'weather forecast {i}', 'label': 'weather'} for i in range(40)]
+        results = benchmark_learning_modes(interactions[:30], interactions[30:])
+        self.assertEqual(set(results), {'refit', 'online'})
+        self.assertGreater(results['online']['accuracy'], 0.5)
+
+    def test_adaptability_updates_in_bounded_mini_batches(self):
+        adaptability = Adaptability(batch_size=8, replay_size=20, random_state=0)
+        examples = [('the answer was great', 'positive'), ('that was wrong and unhelpful', 'negative')]
+        for i in range(200):
+            text, label = examples[i % 2]
+            adaptability.adapt({'text': f'{text} {i}', 'label': label})
+            self.assertLess(len(adaptability.pending_feedback), 8)
+            self.assertLessEqual(len(adaptability.replay_buffer), 20)
+        self.assertEqual(adaptability.feedback_seen, 200)
+        self.assertEqual(adaptability.learner.predict(['great answer']), ['positive'])
+        adaptability.adapt({'text': 'wrong again', 'label': 'negative'})
+        adaptability.flush()
+        self.assertEqual(adaptability.pending_feedback, [])
+
+    def test_interaction_history_spills_to_storage(self):
+        from memory_handling import MemoryStorage
+        storage = MemoryStorage(':memory:')
+        history = InteractionHistory(storage, window=10, spill_batch=5)
+        for i in range(42):
+            history.append({'text': f'text {i}', 'label': 'even' if i % 2 == 0 else 'odd'})
+        self.assertEqual(len(history), 42)
+        self.assertLess(len(history.texts), 15)
+        self.assertEqual(history.spilled, storage.count_learning_records())
+        self.assertEqual(list(history), [{'text': f'text {i}', 'label': 'even' if i % 2 == 0 else 'odd'} for i in range(42)])
+        self.assertEqual(history.recent(2), [{'text': 'text 40', 'label': 'even'}, {'text': 'text 41', 'label': 'odd'}])
+        batches = list(history.iter_batches(batch_size=16))
+        self.assertEqual(sum(len(texts) for texts, _ in batches), 42)
+        self.assertEqual(InteractionHistory(storage).spilled, history.spilled)
+
+    def test_interaction_history_drops_oldest_without_storage(self):
+        history = InteractionHistory(window=10, spill_batch=5)
+        for i in range(42):
+            history.append({'text': f'text {i}', 'label': 'a'})
+        self.assertLess(len(history.texts), 15)
+        self.assertEqual(len(history) + history.dropped, 42)
+        self.assertEqual([record['text'] for record in history], [f'text {i}' for i in range(42 - len(history), 42)])
+
+    def test_interaction_history_keeps_records_when_spill_fails(self):
+        from memory_handling import MemoryStorage
+        storage = MemoryStorage(':memory:')
+        storage.handle_error = lambda error: None
+        history = InteractionHistory(storage, window=3, spill_batch=2)
+        storage.conn.execute("ALTER TABLE learning_history RENAME TO learning_history_offline")
+        for i in range(7):
+            history.append({'text': f'text {i}', 'label': 'a'})
+        self.assertEqual((len(history), history.spilled, len(history.texts)), (7, 0, 7))
+        self.assertEqual(len(list(history)), 7)
+        storage.conn.execute("ALTER TABLE learning_history_offline RENAME TO learning_history")
+        history.append({'text': 'text 7', 'label': 'a'})
+        self.assertEqual((history.spilled, storage.count_learning_records()), (5, 5))
+        self.assertEqual([record['text'] for record in history], [f'text {i}' for i in range(8)])
+
+    def test_snapshot_round_trip_with_memory_mapped_weights(self):
+        examples = [('book a table for two', 'booking'), ('will it rain tomorrow', 'weather'),
+                    ('list files in the folder', 'file_operation')]
+        module = SelfModificationLearningModule()
+        adaptability = Adaptability(batch_size=3)
+        for text, label in examples * 3:
+            adaptability.adapt({'text': text, 'label': label})
+        for text, label in examples[:-1]:
+            module.interaction_history.append({'text': text, 'label': label})
+        module.learn_from_interaction({'text': examples[-1][0], 'label': examples[-1][1]})
+        with tempfile.TemporaryDirectory() as tmp:
+            module.save_snapshot(os.path.join(tmp, 'module.snapshot'))
+            adaptability.save_snapshot(os.path.join(tmp, 'adaptability.snapshot'))
+            warm = SelfModificationLearningModule()
+            warm.load_snapshot(os.path.join(tmp, 'module.snapshot'))
+            texts = ['book a table', 'rain today']
+            self.assertEqual(list(warm.clf.predict(warm.vectorizer.transform(texts))),
+                             list(module.clf.predict(module.vectorizer.transform(texts))))
+            warm_adaptability = Adaptability()
+            warm_adaptability.load_snapshot(os.path.join(tmp, 'adaptability.snapshot'))
+            self.assertIsInstance(warm_adaptability.sgd_clf.coef_, np.memmap)
+            self.assertEqual(warm_adaptability.learner.predict(texts), adaptability.learner.predict(texts))
+            warm_adaptability.adapt({'text': 'delete old files', 'label': 'file_operation'})
+            warm_adaptability.flush()
+            with self.assertRaises(ValueError):
+                warm.load_snapshot(os.path.join(tmp, 'adaptability.snapshot'))
+            del warm_adaptability
+
+    def test_background_trainer_publishes_new_versions(self):
+        module = SelfModificationLearningModule(online=True)
+        trainer = BackgroundTrainer(module, retrain_threshold=10, retrain_interval=60).start()
+        previous = module.model
+        for i in range(25):
+            trainer.submit({'text': f'book a table {i}', 'label': 'booking'} if i % 2 else
+                           {'text': f'weather forecast {i}', 'label': 'weather'})
+        self.assertTrue(trainer.flush(timeout=10))
+        metrics = trainer.metrics()
+        self.assertGreaterEqual(metrics['model_version'], 1)
+        self.assertEqual(metrics['trained_interactions'], 25)
+        self.assertEqual(metrics['pending'], 0)
+        self.assertEqual(metrics['training_lag_seconds'], 0.0)
+        self.assertIsNot(module.model, previous)
+        self.assertIsNone(previous.online_learner.clf.__dict__.get('coef_'))
+        self.assertEqual(len(module.interaction_history), 25)
+        trainer.stop()
+        self.assertFalse(trainer.thread.is_alive())
+
+    def test_background_trainer_keeps_failed_batch_pending(self):
+        module = SelfModificationLearningModule()
+        trainer = BackgroundTrainer(module, retrain_threshold=10, retrain_interval=60).start()
+        trainer.submit({'text': 'book a table', 'label': 'booking'})
+        # SVC cannot be fitted on a single label.
+        self.assertFalse(trainer.flush(timeout=10))
+        metrics = trainer.metrics()
+        self.assertEqual((metrics['model_version'], metrics['trained_interactions']), (0, 0))
+        self.assertEqual((metrics['train_errors'], metrics['pending']), (1, 1))
+        self.assertIsNone(metrics['last_trained_at'])
+        self.assertIsNotNone(metrics['last_train_error'])
+        trainer.submit({'text': 'weather forecast', 'label': 'weather'})
+        self.assertTrue(trainer.flush(timeout=10))
+        metrics = trainer.metrics()
+        self.assertEqual((metrics['model_version'], metrics['trained_interactions']), (1, 2))
+        self.assertEqual(metrics['pending'], 0)
+        trainer.stop()
+
+    def test_prediction_before_first_training(self):
+        for online in (False, True):
+            module = SelfModificationLearningModule(online=online)
+            self.assertEqual(module.predict_top_k(['book a table', 'rain?'], k=2), [[], []])
+            self.assertEqual(module.predict(['book a table']), [(None, None)])
+            module.record_interaction({'text': 'weather forecast', 'label': 'weather'})
+            module.learn_from_interaction({'text': 'book a table', 'label': 'booking'})
+            self.assertEqual(module.predict(['book a table'])[0][0], 'booking')
+
+    def test_batched_prediction_with_cache(self):
+        module = SelfModificationLearningModule()
+        examples = [('book a table for two', 'booking'), ('will it rain tomorrow', 'weather'),
+                    ('list files in the folder', 'file_operation')]
+        for text, label in examples[:-1]:
+            module.record_interaction({'text': text, 'label': label})
+        module.learn_from_interaction({'text': examples[-1][0], 'label': examples[-1][1]})
+        predictions = module.predict(['book a table', 'rain tomorrow', 'book a table'])
+        self.assertEqual([label for label, _ in predictions], ['booking', 'weather', 'booking'])
+        top = module.predict_top_k(['list the files'], k=2)[0]
+        self.assertEqual(len(top), 2)
+        self.assertEqual(top[0][0], 'file_operation')
+        self.assertGreaterEqual(top[0][1], top[1][1])
+        self.assertIn('book a table', module.prediction_cache)
+        module.learn_from_interaction({'text': 'reserve a room', 'label': 'booking'})
+        module.predict(['rain tomorrow'])
+        self.assertNotIn('book a table', module.prediction_cache)
+
+    def test_prediction_cache_dropped_when_snapshot_loaded(self):
+        def trained(examples):
+            module = SelfModificationLearningModule()
+            for text, label in examples[:-1]:
+                module.record_interaction({'text': text, 'label': label})
+            module.learn_from_interaction({'text': examples[-1][0], 'label': examples[-1][1]})
+            return module
+
+        first = trained([('book a table', 'booking'), ('will it rain', 'weather')])
+        second = trained([('book a table', 'zzz_other'), ('will it rain', 'weather')])
+        self.assertEqual(first.model.version, second.model.version)
+        self.assertEqual(first.predict(['book a table'])[0][0], 'booking')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.snapshot')
+            second.save_snapshot(path)
+            first.load_snapshot(path)
+        self.assertEqual(first.predict(['book a table'])[0][0], 'zzz_other')
+
+    def test_binary_prediction_scores(self):
+        module = SelfModificationLearningModule()
+        module.record_interaction({'text': 'great answer', 'label': 'positive'})
+        module.learn_from_interaction({'text': 'wrong answer', 'label': 'negative'})
+        self.assertEqual(module.predict(['great'])[0][0], 'positive')
+        self.assertEqual(module.predict(['wrong'])[0][0], 'negative')
+
+    def test_problem_solving_caches_by_canonical_form(self):
+        solver = ProblemSolving(cache_size=8)
+        self.assertEqual(solver.solve_equation('x**2 - 4'), [-2, 2])
+        solution = solver.solve_equation('x**2-4')
+        self.assertEqual(solution, [-2, 2])
+        self.assertEqual(solver.cache_info()['results']['hits'], 1)
+        solution.append('mutated')
+        self.assertEqual(solver.solve_equation('x**2 - 4'), [-2, 2])
+        self.assertEqual(solver.find_derivative('x**3'), sp.sympify('3*x**2'))
+        self.assertEqual(solver.integrate_expression('2*x'), sp.sympify('x**2'))
+        for i in range(20):
+            solver.find_derivative(f'x**{i + 2}')
+        self.assertLessEqual(solver.cache_info()['results']['size'], 8)
+
+    def test_compile_returns_vectorized_numpy_function(self):
+        solver = ProblemSolving()
+        f = solver.compile('x**2 + y')
+        self.assertEqual([s.name for s in f.symbols], ['x', 'y'])
+        np.testing.assert_allclose(f(np.arange(4), 1.0), [1.0, 2.0, 5.0, 10.0])
+        self.assertIs(solver.compile('x**2+y'), f)
+        g = solver.compile('x**2 + y', variables=['y', 'x'])
+        self.assertEqual(g(1.0, 3.0), 10.0)
+
+    def test_minimize_expression_with_symbolic_derivatives(self):
+        solver = ProblemSolving()
+        expression, variables = rosenbrock_expression(4)
+        result = solver.minimize_expression(expression, np.full(4, -1.2), variables=variables)
+        self.assertTrue(result.success)
+        np.testing.assert_allclose(result.x, np.ones(4), atol=1e-3)
+        gradient, hessian = solver.compile_derivatives('x**2 + 3*x*y', variables=['x', 'y'])
+        np.testing.assert_allclose(gradient(1.0, 2.0), [8.0, 3.0])
+        np.testing.assert_allclose(hessian(1.0, 2.0), [[2.0, 3.0], [3.0, 0.0]])
+        bfgs = solver.minimize_expression('(x - 3)**2 + (y + 1)**2', [0.0, 0.0], method='BFGS')
+        np.testing.assert_allclose(bfgs.x, [3.0, -1.0], atol=1e-5)
+
+    def test_vectorized_evaluation(self):
+        solver = ProblemSolving()
+        x = np.linspace(-1, 1, 1000)
+        np.testing.assert_allclose(solver.evaluate('x**2 + y', {'x': x, 'y': 2.0}), x ** 2 + 2.0)
+        self.assertEqual(solver.evaluate('5', {'x': x}).shape, x.shape)
+        grid = solver.evaluate_grid('x*y', {'x': [1.0, 2.0], 'y': [1.0, 2.0, 3.0]})
+        np.testing.assert_allclose(grid, [[1.0, 2.0, 3.0], [2.0, 4.0, 6.0]])
+        results = benchmark_minimization(dimensions=(2,))
+        self.assertEqual([r['problem'] for r in results], ['rosenbrock-2d', 'beale'])
+        self.assertLess(results[0]['symbolic']['fun'], 1e-8)
+
+    def test_solver_executor_times_out_and_replaces_stuck_workers(self):
+        with SolverExecutor(max_workers=2, timeout=5.0) as executor:
+            stuck = executor.submit(time.sleep, 30, timeout=0.5)
+            running = executor.submit(time.sleep, 30)
+            queued = executor.submit('solve', sp.sympify('x**2 - 9'))
+            with self.assertRaises(TimeoutError):
+                stuck.result(timeout=20)
+            time.sleep(0.2)
+            self.assertTrue(running.cancel())
+            self.assertEqual(queued.result(timeout=20), [-3, 3])
+            with self.assertRaises(RuntimeError):
+                executor.submit('solve', 'x +* 1').result(timeout=20)
+        metrics = executor.metrics()
+        self.assertEqual(metrics['timed_out'], 1)
+        self.assertEqual(metrics['failed'], 1)
+        self.assertEqual(metrics['cancelled'], 1)
+        self.assertEqual(metrics['worker_restarts'], 2)
+
+    def test_problem_solving_fans_out_to_executor(self):
+        with SolverExecutor(max_workers=2) as executor:
+            solver = ProblemSolving(executor=executor)
+            self.assertEqual(solver.solve_equation('x**2 - 4'), [-2, 2])
+            results = dict(solver.solve_many(['x - 1', 'x**2 - 4', 'x - 3']))
+            self.assertEqual(results, {0: [1], 1: [-2, 2], 2: [3]})
+            self.assertEqual(solver.integrate_expression('2*x'), sp.sympify('x**2'))
+            systems = [(['x + y - 2', 'x - y'], ['x', 'y']), (['x - 5'], ['x'])]
+            solutions = dict(solver.solve_systems(systems))
+            self.assertEqual(solutions[1], {sp.Symbol('x'): 5})
+            self.assertEqual(solutions[0], {sp.Symbol('x'): 1, sp.Symbol('y'): 1})
+
+    def test_streaming_analysis_matches_pandas(self):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.normal(1e6, 1.0, size=(500, 3)), columns=['a', 'b', 'c'])
+        data['b'] += 2 * data['a']
+        data.loc[rng.random(500) < 0.1, 'a'] = np.nan
+        data.loc[rng.random(500) < 0.2, 'c'] = np.nan
+        data['label'] = 'x'
+        solver = ProblemSolving()
+        expected = solver.analyze_data(data[['a', 'b', 'c']])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.csv')
+            data.to_csv(path, index=False)
+            streamed = solver.analyze_data(path, chunksize=37)
+        pd.testing.assert_frame_equal(streamed['summary_statistics'], expected['summary_statistics'], rtol=1e-9)
+        pd.testing.assert_frame_equal(streamed['correlation_matrix'], expected['correlation_matrix'], rtol=1e-9)
+        merged = solver.stream_statistics(data.iloc[:200], chunksize=50).merge(
+            solver.stream_statistics(data.iloc[200:], chunksize=50)).result()
+        pd.testing.assert_frame_equal(merged['correlation_matrix'], expected['correlation_matrix'], rtol=1e-9)
+
     def test_generate_code(self):
         module = SelfModificationLearningModule()
         task_context = {'function_name': 'example_function', 'parameters': 'param1, param2'}
@@ -1,6 +1,17 @@
-import requests
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import unittest
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 import openai
 import logging
+from http_transport import get_shared_transport, HTTPResponseCache, StandInHTTPServer, StandInRequestHandler
+from file_operations import FileOperationsModule
 
 # Configure logging
 logger = logging.getLogger('WebManipulationModule')
@@ -11,8 +22,16 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 class WebManipulationModule:
-    def __init__(self):
-        self.session = requests.Session()
+    # Seconds fetch_many waits for assistance on a missed deadline.
+    ASSISTANCE_TIMEOUT = 10.0
+
+    def __init__(self, transport=None, cache=None):
+        # Shares the pooled keep-alive transport used by APIHandler unless one is given.
+        self.transport = transport if transport else get_shared_transport()
+        self.session = self.transport.session
+        # get_web_page goes through an in-memory HTTP cache by default; pass an
+        # HTTPResponseCache with a directory for a disk tier, or cache=False to disable.
+        self.cache = cache if cache is not None else HTTPResponseCache()
 
     def get_web_page(self, url):
         """
@@ -25,7 +44,10 @@ class WebManipulationModule:
             str: The content of the web page.
         """
         try:
-            response = self.session.get(url)
+            if self.cache:
+                response = self.cache.get(self.transport, url)
+            else:
+                response = self.transport.get(url)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -47,7 +69,7 @@ class WebManipulationModule:
             str: Response from the web server.
         """
         try:
-            response = self.session.post(url, data=data, headers=headers)
+            response = self.transport.post(url, data=data, headers=headers)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -56,6 +78,167 @@ class WebManipulationModule:
             logger.error(f"Error: {error_message}\nAssistance: {assistance}")
             return assistance
 
+    def download_to_file(self, url, file_operations, filename=None, chunk_size=64 * 1024, hash_algorithm='sha256'):
+        """
+        Stream a URL to a file under the FileOperationsModule's current directory.
+
+        The body is written chunk by chunk as it arrives and hashed
+        incrementally, so memory use does not depend on its size. Data is
+        written to '<filename>.part' and renamed when complete. If a partial
+        download exists, it is resumed with an HTTP Range request guarded by
+        If-Range, and restarted from scratch if the server sends the whole
+        body instead or answers with a different range.
+
+        Args:
+            url (str): The URL to download.
+            file_operations (FileOperationsModule): Supplies the target directory.
+            filename (str): Target file name. Defaults to the last URL path segment.
+            chunk_size (int): Bytes read and written at a time.
+            hash_algorithm (str): Any hashlib algorithm name.
+
+        Returns:
+            dict: 'path', 'bytes', 'hash', 'hash_algorithm' and 'resumed_from'
+                (bytes kept from an earlier attempt), or assistance (str) on error.
+        """
+        try:
+            directory = os.path.realpath(file_operations.current_directory)
+            name = os.path.basename(filename or urlsplit(url).path.rstrip('/')) or 'download'
+            path = os.path.join(directory, name)
+            part_path, meta_path = path + '.part', path + '.part.json'
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            validator = None
+            if offset and os.path.exists(meta_path):
+                with open(meta_path) as meta_file:
+                    validator = json.load(meta_file).get('validator')
+            while True:
+                # Ask for the raw bytes so ranges line up with what is on disk.
+                headers = {'Accept-Encoding': 'identity'}
+                if offset and validator:
+                    headers['Range'] = f'bytes={offset}-'
+                    headers['If-Range'] = validator
+                else:
+                    offset = 0
+                response = self.transport.get(url, headers=headers, stream=True)
+                if (offset and response.status_code == 206
+                        and not response.headers.get('Content-Range', '').startswith(f'bytes {offset}-')):
+                    # A range other than the one asked for cannot be appended
+                    # to the kept bytes; drop them and ask for the whole body.
+                    response.close()
+                    for stale_path in (part_path, meta_path):
+                        if os.path.exists(stale_path):
+                            os.remove(stale_path)
+                    offset, validator = 0, None
+                    continue
+                break
+            with response:
+                if response.status_code == 416 and response.headers.get('Content-Range') == f'bytes */{offset}':
+                    chunks = ()
+                elif offset and response.status_code == 206:
+                    chunks = response.iter_content(chunk_size)
+                else:
+                    response.raise_for_status()
+                    if response.status_code != 200:
+                        raise ValueError(f"Unexpected {response.status_code} response for a full download of {url}")
+                    offset = 0
+                    chunks = response.iter_content(chunk_size)
+                validator = response.headers.get('ETag') or response.headers.get('Last-Modified') or validator
+                with open(meta_path, 'w') as meta_file:
+                    json.dump({'url': url, 'validator': validator}, meta_file)
+                hasher = hashlib.new(hash_algorithm)
+                with open(part_path, 'r+b' if offset else 'wb') as part_file:
+                    if offset:
+                        # Re-hash the bytes kept from the earlier attempt; the
+                        # read leaves the file positioned to append after them.
+                        for block in iter(lambda: part_file.read(chunk_size), b''):
+                            hasher.update(block)
+                    for chunk in chunks:
+                        part_file.write(chunk)
+                        hasher.update(chunk)
+                    size = part_file.tell()
+            os.replace(part_path, path)
+            os.remove(meta_path)
+            return {'path': path, 'bytes': size, 'hash': hasher.hexdigest(),
+                    'hash_algorithm': hash_algorithm, 'resumed_from': offset}
+        except Exception as e:
+            error_message = str(e)
+            assistance = self.get_assistance(error_message)
+            logger.error(f"Error: {error_message}\nAssistance: {assistance}")
+            return assistance
+
+    async def fetch_many(self, urls, concurrency=10, per_host_limit=4, deadline=None):
+        """
+        Fetch many web pages concurrently, yielding each as soon as it completes.
+
+        Fetches run get_web_page on worker threads driven by the event loop,
+        so each URL keeps its usual error-to-result behavior and reuses the
+        pooled transport. At most concurrency requests are in flight overall
+        and at most per_host_limit to any one host.
+
+        Args:
+            urls (list): The URLs to fetch.
+            concurrency (int): Maximum requests in flight.
+            per_host_limit (int): Maximum requests in flight per host.
+            deadline (float): Seconds allowed for the whole batch. URLs not
+                finished by then yield the assistance for a deadline error.
+
+        Yields:
+            tuple: (url, content) in completion order.
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fetch_many')
+        in_flight = asyncio.Semaphore(concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+        async def fetch(url):
+            # Wait for the host's slot first so a busy host does not hold
+            # global slots that other hosts could use.
+            async with host_limits[urlsplit(url).netloc]:
+                async with in_flight:
+                    return url, await loop.run_in_executor(executor, self.get_web_page, url)
+
+        tasks = [asyncio.ensure_future(fetch(url)) for url in urls]
+        try:
+            for completed in asyncio.as_completed(tasks, timeout=deadline):
+                try:
+                    yield await completed
+                except asyncio.TimeoutError:
+                    break
+            unfinished = [url for url, task in zip(urls, tasks) if not task.done()]
+            if unfinished:
+                error_message = f"Deadline of {deadline} seconds exceeded before {len(unfinished)} URLs finished"
+                # get_assistance blocks on a remote call; run it on its own
+                # thread, since the fetch pool may be full of stuck requests,
+                # and bound the wait so the loop is not held past the deadline.
+                assistance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fetch_many_assistance')
+                try:
+                    assistance = await asyncio.wait_for(
+                        loop.run_in_executor(assistance_executor, self.get_assistance, error_message),
+                        self.ASSISTANCE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    assistance = "I encountered an error and couldn't get assistance."
+                finally:
+                    assistance_executor.shutdown(wait=False)
+                logger.error(f"Error: {error_message}\nAssistance: {assistance}")
+                for url in unfinished:
+                    yield url, assistance
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Requests already running finish in the background, bounded by
+            # the transport's read timeout.
+            executor.shutdown(wait=False)
+
+    def fetch_pages(self, urls, **kwargs):
+        """
+        Blocking wrapper around fetch_many for callers without an event loop.
+
+        Returns:
+            list: (url, content) pairs in completion order.
+        """
+        async def collect():
+            return [result async for result in self.fetch_many(urls, **kwargs)]
+        return asyncio.run(collect())
+
     def get_assistance(self, context):
         """
         Get assistance from ChatGPT-3.5 for handling errors.
@@ -80,6 +263,179 @@ class WebManipulationModule:
             logger.error(f"Error getting assistance: {error_message}")
             return "I encountered an error and couldn't get assistance."
 
+class LocalAssistanceWebModule(WebManipulationModule):
+    def get_assistance(self, context):
+        return f"assistance: {context}"
+
+class TestWebManipulationModule(unittest.TestCase):
+    def serve(self, scenario):
+        # Minimal keep-alive HTTP/1.1 server on the test's event loop. Paths
+        # look like /<name>?delay=<seconds>; /missing answers 404.
+        state = {'in_flight': 0, 'max_in_flight': 0}
+
+        async def handle(reader, writer):
+            try:
+                await respond(reader, writer)
+            except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+                pass
+            writer.close()
+
+        async def respond(reader, writer):
+            while True:
+                request = await reader.readuntil(b'\r\n\r\n')
+                target = urlsplit(request.split(b' ')[1].decode())
+                delay = float(target.query.split('=')[1]) if target.query else 0.0
+                state['in_flight'] += 1
+                state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+                await asyncio.sleep(delay)
+                state['in_flight'] -= 1
+                status = '404 Not Found' if target.path == '/missing' else '200 OK'
+                body = target.path.encode()
+                writer.write(f'HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+                await writer.drain()
+
+        async def run():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            base = f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+            try:
+                return await scenario(base), state
+            finally:
+                server.close()
+
+        return asyncio.run(run())
+
+    def test_fetch_many_limits_per_host_concurrency(self):
+        module = LocalAssistanceWebModule()
+
+        async def scenario(base):
+            urls = [f'{base}/missing'] + [f'{base}/page{i}?delay=0.3' for i in range(8)]
+            start = time.perf_counter()
+            results = [result async for result in module.fetch_many(urls, concurrency=8, per_host_limit=4)]
+            return results, time.perf_counter() - start
+
+        (results, elapsed), state = self.serve(scenario)
+        self.assertEqual(results[0][0].split('/')[-1], 'missing')
+        self.assertIn('assistance: 404', results[0][1])
+        self.assertEqual(sorted(content for _, content in results[1:]), sorted(f'/page{i}' for i in range(8)))
+        self.assertEqual(state['max_in_flight'], 4)
+        self.assertLess(elapsed, 8 * 0.3)
+
+    def test_fetch_many_deadline(self):
+        module = LocalAssistanceWebModule()
+
+        async def scenario(base):
+            urls = [f'{base}/fast?delay=0', f'{base}/slow?delay=2']
+            return [result async for result in module.fetch_many(urls, deadline=0.5)]
+
+        results, _ = self.serve(scenario)
+        self.assertEqual(results[0][1], '/fast')
+        self.assertTrue(results[1][0].endswith('/slow?delay=2'))
+        self.assertIn('Deadline of 0.5 seconds exceeded', results[1][1])
+
+    def test_fetch_many_deadline_assistance_does_not_block_loop(self):
+        class SlowAssistanceWebModule(WebManipulationModule):
+            ASSISTANCE_TIMEOUT = 0.5
+
+            def get_assistance(self, context):
+                time.sleep(1.0)
+                return 'too late'
+
+        module = SlowAssistanceWebModule(cache=False)
+
+        async def scenario(base):
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.02)
+
+            ticker = asyncio.ensure_future(tick())
+            results = [result async for result in module.fetch_many([f'{base}/slow?delay=2'], deadline=0.2)]
+            ticker.cancel()
+            return results, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+        (results, longest_gap), _ = self.serve(scenario)
+        self.assertEqual(results[0][1], "I encountered an error and couldn't get assistance.")
+        self.assertLess(longest_gap, 0.3)
+
+class RangeRequestHandler(StandInRequestHandler):
+    # Serves a deterministic 4 MiB body with an ETag and byte ranges. When
+    # the server's drop_after is set, the first full response is cut off
+    # after that many bytes.
+    body = bytes(range(256)) * (4 * 4096)
+
+    def do_GET(self):
+        self.server.range_headers.append(self.headers.get('Range'))
+        start = 0
+        if self.headers.get('Range') and self.headers.get('If-Range') == '"body-v1"':
+            start = int(self.headers['Range'].split('=')[1].rstrip('-'))
+            # A server's range_shift moves ranged responses earlier than asked.
+            start -= getattr(self.server, 'range_shift', 0)
+        self.send_response(206 if start else 200)
+        self.send_header('ETag', '"body-v1"')
+        self.send_header('Content-Length', str(len(self.body) - start))
+        if start:
+            self.send_header('Content-Range', f'bytes {start}-{len(self.body) - 1}/{len(self.body)}')
+        self.end_headers()
+        if self.server.drop_after and not start:
+            self.wfile.write(self.body[:self.server.drop_after])
+            self.server.drop_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(self.body[start:])
+
+class TestStreamingDownload(unittest.TestCase):
+    def test_download_resumes_with_range_and_hashes_incrementally(self):
+        module = LocalAssistanceWebModule(cache=False)
+        expected = hashlib.sha256(RangeRequestHandler.body).hexdigest()
+        with StandInHTTPServer(RangeRequestHandler) as server, tempfile.TemporaryDirectory() as directory:
+            server.range_headers = []
+            server.drop_after = 1500000
+            files = FileOperationsModule(directory)
+            failed = module.download_to_file(f'{server.url}/exports/data.bin', files)
+            self.assertIsInstance(failed, str)
+            # Only whole chunks received before the connection dropped are kept.
+            kept = os.path.getsize(os.path.join(directory, 'data.bin.part'))
+            self.assertTrue(0 < kept <= 1500000)
+            result = module.download_to_file(f'{server.url}/exports/data.bin', files)
+            self.assertEqual(server.range_headers, [None, f'bytes={kept}-'])
+            self.assertEqual(result['resumed_from'], kept)
+            self.assertEqual(result['hash'], expected)
+            self.assertEqual(result['bytes'], len(RangeRequestHandler.body))
+            self.assertEqual(sorted(os.listdir(directory)), ['data.bin'])
+            with open(result['path'], 'rb') as downloaded:
+                self.assertEqual(downloaded.read(), RangeRequestHandler.body)
+
+    def test_download_restarts_when_range_does_not_match(self):
+        module = LocalAssistanceWebModule(cache=False)
+        with StandInHTTPServer(RangeRequestHandler) as server, tempfile.TemporaryDirectory() as directory:
+            server.range_headers = []
+            server.drop_after = None
+            server.range_shift = 16
+            with open(os.path.join(directory, 'data.bin.part'), 'wb') as part_file:
+                part_file.write(RangeRequestHandler.body[:1000])
+            with open(os.path.join(directory, 'data.bin.part.json'), 'w') as meta_file:
+                json.dump({'url': 'data.bin', 'validator': '"body-v1"'}, meta_file)
+            result = module.download_to_file(f'{server.url}/exports/data.bin', FileOperationsModule(directory))
+            self.assertEqual(server.range_headers, ['bytes=1000-', None])
+            self.assertEqual(result['resumed_from'], 0)
+            self.assertEqual(result['hash'], hashlib.sha256(RangeRequestHandler.body).hexdigest())
+            self.assertEqual(sorted(os.listdir(directory)), ['data.bin'])
+
+    def test_download_memory_does_not_grow_with_body(self):
+        import tracemalloc
+        module = LocalAssistanceWebModule(cache=False)
+        with StandInHTTPServer(RangeRequestHandler) as server, tempfile.TemporaryDirectory() as directory:
+            server.range_headers = []
+            server.drop_after = None
+            tracemalloc.start()
+            result = module.download_to_file(f'{server.url}/data.bin', FileOperationsModule(directory), filename='copy.bin')
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.assertEqual(result['resumed_from'], 0)
+        self.assertLess(peak, len(RangeRequestHandler.body) // 4)
+
 # Example usage:
 if __name__ == "__main__":
     web_module = WebManipulationModule()